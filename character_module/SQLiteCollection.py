@@ -1,22 +1,617 @@
+import re
+import json
+import uuid
+import sqlite3
+import threading
+from collections import Counter
+
+from .cursors import SQLiteCursor, ASCENDING, DESCENDING
+from .operations import (
+    InsertOne,
+    UpdateOne,
+    DeleteOne,
+    InsertOneResult,
+    InsertManyResult,
+    UpdateResult,
+    DeleteResult,
+    BulkWriteResult,
+)
+
+COMPARISON_OPS = {
+    "$eq": "=",
+    "$ne": "!=",
+    "$gt": ">",
+    "$gte": ">=",
+    "$lt": "<",
+    "$lte": "<=",
+}
+# characters that make a $regex more than a literal prefix
+REGEX_SPECIAL = set(".^$*+?{}[]\\|()")
+
+
+def _regexp(pattern, value, flags=0):
+    if value is None:
+        return False
+    return re.search(pattern, str(value), flags) is not None
+
+
+def _regexp_i(pattern, value):
+    return _regexp(pattern, value, re.IGNORECASE)
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _to_sql(value):
+    """Lists and dicts are stored as JSON text."""
+    if isinstance(value, (list, tuple, dict)):
+        return json.dumps(value)
+    return value
+
+
+def _column_type(value):
+    if isinstance(value, (list, tuple, dict)):
+        return "JSON"
+    if isinstance(value, (bool, int)):
+        return "INTEGER"
+    if isinstance(value, float):
+        return "REAL"
+    if isinstance(value, str):
+        return "TEXT"
+    return ""
+
+
+def _literal_prefix(pattern):
+    """'abc' for '^abc' (no other regex syntax), otherwise None."""
+    if not pattern.startswith("^") or len(pattern) < 2:
+        return None
+    prefix = pattern[1:]
+    if any(ch in REGEX_SPECIAL for ch in prefix) or prefix[-1] == chr(0x10FFFF):
+        return None
+    return prefix
+
+
+class QueryCompiler:
+    """
+    Turns a Mongo-style filter into a parameterized SQL WHERE clause.
+
+    Supports equality, $eq/$ne/$gt/$gte/$lt/$lte, $in/$nin, $regex (with
+    $options "i") and top-level $and/$or. Fields that are not columns of the
+    table behave like missing fields in Mongo: they only equal None.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def compile(self, query):
+        """Return (sql, params, fields) where fields are the columns filtered on."""
+        self.params = []
+        self.fields = []
+        sql = self._document(query or {})
+        return sql, self.params, self.fields
+
+    def _document(self, query):
+        clauses = []
+        for field, condition in query.items():
+            if field in ("$and", "$or"):
+                parts = [self._document(sub) for sub in condition]
+                joiner = " AND " if field == "$and" else " OR "
+                clauses.append("(" + joiner.join(parts or ["1"]) + ")")
+            elif field.startswith("$"):
+                raise ValueError(f"Unsupported query operator {field}")
+            elif isinstance(condition, dict) and any(
+                key.startswith("$") for key in condition
+            ):
+                clauses.extend(self._operators(field, condition))
+            else:
+                clauses.append(self._compare(field, "$eq", condition))
+        return " AND ".join(clauses) if clauses else "1"
+
+    def _operators(self, field, condition):
+        clauses = []
+        for op, value in condition.items():
+            if op in COMPARISON_OPS:
+                clauses.append(self._compare(field, op, value))
+            elif op in ("$in", "$nin"):
+                clauses.append(self._membership(field, op, list(value)))
+            elif op == "$regex":
+                options = condition.get("$options", "")
+                clauses.append(self._regex(field, value, options))
+            elif op == "$options":
+                continue
+            else:
+                raise ValueError(f"Unsupported query operator {op}")
+        return clauses
+
+    def _column(self, field):
+        if field not in self.columns:
+            return None
+        self.fields.append(field)
+        return _quote(field)
+
+    def _compare(self, field, op, value):
+        column = self._column(field)
+        if column is None:
+            # a missing field only equals None and is never greater or less
+            if op == "$ne":
+                matches = value is not None
+            else:
+                matches = value is None and op in ("$eq", "$gte", "$lte")
+            return "1" if matches else "0"
+        if value is None:
+            if op == "$eq":
+                return f"{column} IS NULL"
+            if op == "$ne":
+                return f"{column} IS NOT NULL"
+        self.params.append(_to_sql(value))
+        return f"{column} {COMPARISON_OPS[op]} ?"
+
+    def _membership(self, field, op, values):
+        column = self._column(field)
+        if column is None:
+            found = None in values
+            return "1" if found == (op == "$in") else "0"
+        if not values:
+            return "0" if op == "$in" else "1"
+        self.params.extend(values)
+        placeholders = ", ".join("?" * len(values))
+        negate = "NOT " if op == "$nin" else ""
+        return f"{column} {negate}IN ({placeholders})"
+
+    def _regex(self, field, pattern, options):
+        if hasattr(pattern, "pattern"):  # compiled re.Pattern
+            if pattern.flags & re.IGNORECASE:
+                options += "i"
+            pattern = pattern.pattern
+        column = self._column(field)
+        if column is None:
+            return "0"
+
+        prefix = _literal_prefix(pattern)
+        if prefix is not None and "i" not in options:
+            # ^abc becomes a range scan, so an index on the column is used
+            upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+            self.params.extend([prefix, upper])
+            return f"({column} >= ? AND {column} < ?)"
+
+        self.params.append(pattern)
+        function = "REGEXP_I" if "i" in options else "REGEXP"
+        return f"{function}(?, {column})"
+
+
 class SQLiteCollectionWrapper:
+    """
+    A SQLite table with a subset of the pymongo Collection API.
+
+    Filters, projections, sort, skip and limit are compiled into the SQL
+    statement, so SQLite does the filtering and uses its indexes. A field
+    that keeps being filtered on without an index gets one automatically
+    after AUTO_INDEX_AFTER queries: it is built on a second connection in a
+    background thread (with the next write for in-memory databases), never
+    inside the read, and not at all when the connection is read-only.
+
+    Writes are per-record transactions. The table is created (keyed on _id)
+    on the first write, and a column is added for each new field once it has
+    a value other than None. List and dict values go into columns declared
+    JSON and come back decoded (a TypeError for any other column); NULL
+    columns are left out of the returned documents.
+    """
+
+    AUTO_INDEX_AFTER = 3
+
     def __init__(self, conn, table_name):
         self.conn = conn
         self.table = table_name
         self.cursor = self.conn.cursor()
 
-    def find(self, query=None):
-        self.cursor.execute(f"SELECT * FROM {self.table}")
-        col_names = [desc[0] for desc in self.cursor.description]
-        results = []
-        for row in self.cursor.fetchall():
-            row_dict = {col_names[i]: row[i] for i in range(len(col_names))}
-            if query:
-                if all(row_dict.get(k) == v for k, v in query.items()):
-                    results.append(row_dict)
+        self.conn.create_function("REGEXP", 2, _regexp, deterministic=True)
+        self.conn.create_function("REGEXP_I", 2, _regexp_i, deterministic=True)
+
+        self._columns = None
+        self._json_columns = set()
+        self._indexed = None  # first column of every index on the table
+        self._pending_indexes = []  # (keys, sql) waiting for their columns
+        self._query_counts = Counter()
+
+        self._writable = None  # unknown until the first auto index
+        self._auto_indexed = set()  # fields whose auto index was requested
+        self.failed_auto_indexes = set()  # fields whose auto index failed
+        self._index_queue = []  # (field, sql) for the builder thread
+        self._index_builder = None
+        self._builder_lock = threading.Lock()
+
+    # schema
+
+    @property
+    def columns(self):
+        if self._columns is None:
+            rows = self.conn.execute(
+                f"PRAGMA table_info({_quote(self.table)})"
+            ).fetchall()
+            self._columns = [row[1] for row in rows]
+            self._json_columns = {row[1] for row in rows if row[2].upper() == "JSON"}
+        return self._columns
+
+    def _ensure_columns(self, docs):
+        """Create the table and add a column for every new field in docs."""
+        table = _quote(self.table)
+        if not self.columns:
+            self.conn.execute(
+                f'CREATE TABLE IF NOT EXISTS {table} ("_id" TEXT PRIMARY KEY)'
+            )
+            self._columns = None
+
+        # NULL already means "missing", so a None value adds no column; the
+        # column waits for a value it can take its declared type from
+        new_columns = {}  # field -> declared type
+        for doc in docs:
+            for field, value in doc.items():
+                if value is None or field in self.columns or field in new_columns:
+                    continue
+                new_columns[field] = _column_type(value)
+        for field, col_type in new_columns.items():
+            self.conn.execute(
+                f"ALTER TABLE {table} ADD COLUMN {_quote(field)} {col_type}"
+            )
+        if new_columns:
+            self._columns = None
+        if self._pending_indexes:
+            self._create_pending_indexes()
+
+        # only JSON columns are decoded on read, so lists and dicts go nowhere else
+        self.columns  # loads the JSON column names
+        for doc in docs:
+            for field, value in doc.items():
+                if isinstance(value, (list, tuple, dict)) and (
+                    field not in self._json_columns
+                ):
+                    raise TypeError(
+                        f"{self.table}.{field} is not a JSON column; "
+                        f"cannot store a {type(value).__name__} in it"
+                    )
+
+    def row_to_doc(self, col_names, row):
+        """The document for a result row; col_names from cursor.description."""
+        # NULL is how a field a document does not have is stored, so it is
+        # left out, like a missing field in Mongo
+        doc = {name: value for name, value in zip(col_names, row) if value is not None}
+        self.columns  # loads the JSON column names
+        for field in self._json_columns.intersection(doc):
+            if isinstance(doc[field], str):
+                doc[field] = json.loads(doc[field])
+        return doc
+
+    def indexed_fields(self):
+        if self._indexed is None:
+            self._indexed = set()
+            table = _quote(self.table)
+            for index in self.conn.execute(f"PRAGMA index_list({table})").fetchall():
+                info = self.conn.execute(f"PRAGMA index_info({_quote(index[1])})")
+                first = info.fetchone()
+                if first is not None and first[2] is not None:
+                    self._indexed.add(first[2])
+            # INTEGER PRIMARY KEY columns are the rowid, always indexed
+            for row in self.conn.execute(f"PRAGMA table_info({table})"):
+                if row[5] == 1 and row[2].upper() == "INTEGER":
+                    self._indexed.add(row[1])
+        return self._indexed
+
+    def create_index(self, keys, unique=False, name=None):
+        """
+        Create an index like pymongo's create_index: keys is a field name or
+        a list of (field, ASCENDING/DESCENDING). Returns the index name.
+        """
+        if isinstance(keys, str):
+            keys = [(keys, ASCENDING)]
+
+        name = name or "_".join(
+            [f"idx_{self.table}"] + [f"{field}_{order}" for field, order in keys]
+        )
+        sql = self._index_sql(keys, unique, name)
+        if any(field not in self.columns for field, _ in keys):
+            # like Mongo, fields may not exist yet; created with the columns
+            self._pending_indexes.append((keys, sql))
+            return name
+
+        with self.conn:
+            self.conn.execute(sql)
+        self.indexed_fields().add(keys[0][0])
+        return name
+
+    def _index_sql(self, keys, unique, name):
+        column_list = ", ".join(
+            f"{_quote(field)} {'DESC' if direction == DESCENDING else 'ASC'}"
+            for field, direction in keys
+        )
+        return (
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS "
+            f"{_quote(name)} ON {_quote(self.table)} ({column_list})"
+        )
+
+    def _create_pending_indexes(self):
+        """Create the declared indexes whose columns exist now (no commit)."""
+        for keys, sql in list(self._pending_indexes):
+            if all(field in self.columns for field, _ in keys):
+                self.conn.execute(sql)
+                self.indexed_fields().add(keys[0][0])
+                self._pending_indexes.remove((keys, sql))
+
+    # queries
+
+    def find(self, query=None, projection=None, sort=None, limit=0, skip=0):
+        """Return a lazy SQLiteCursor; rows are read in batches while iterating."""
+        return SQLiteCursor(
+            self, query, projection, sort=sort, limit=limit, skip=skip
+        )
+
+    def find_one(self, query=None, projection=None, sort=None):
+        if not self.columns:
+            return None  # table not created yet
+        sql, params = self.select_sql(query, projection, sort, limit=1, skip=0)
+        cursor = self.conn.execute(sql, params)
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return self.row_to_doc([desc[0] for desc in cursor.description], row)
+
+    def count_documents(self, query=None):
+        if not self.columns:
+            return 0
+        where, params = self._where(query)
+        sql = f"SELECT COUNT(*) FROM {_quote(self.table)} WHERE {where}"
+        return self.conn.execute(sql, params).fetchone()[0]
+
+    def _where(self, query, auto_index=True):
+        where, params, fields = QueryCompiler(set(self.columns)).compile(query)
+        if auto_index:
+            self._auto_index(fields)
+        return where, params
+
+    def select_sql(self, query, projection, sort, limit, skip):
+        """Return (sql, params) of the SELECT for a find() with these options."""
+        where, params = self._where(query)
+        sql = (
+            f"SELECT {self._projection(projection)} FROM {_quote(self.table)} "
+            f"WHERE {where}"
+        )
+
+        order = self._order_by(sort)
+        if order:
+            sql += f" ORDER BY {order}"
+        if limit or skip:
+            sql += " LIMIT ? OFFSET ?"
+            params = params + [limit or -1, skip]
+        return sql, params
+
+    def _projection(self, projection):
+        if not projection:
+            return "*"
+        if not isinstance(projection, dict):  # list of field names
+            projection = {field: 1 for field in projection}
+
+        included = [f for f, on in projection.items() if on and f != "_id"]
+        if included:
+            fields = included
+            if projection.get("_id", 1) and "_id" in self.columns:
+                fields = ["_id"] + fields
+        else:
+            excluded = {f for f, on in projection.items() if not on}
+            fields = [c for c in self.columns if c not in excluded]
+
+        fields = [f for f in fields if f in self.columns]
+        return ", ".join(_quote(f) for f in fields) if fields else "NULL AS _none"
+
+    def _order_by(self, sort):
+        if not sort:
+            return ""
+        if isinstance(sort, str):
+            sort = [(sort, ASCENDING)]
+        parts = []
+        for field, direction in sort:
+            if field not in self.columns:
+                continue  # missing everywhere, so it does not change the order
+            order = "DESC" if direction == DESCENDING else "ASC"
+            parts.append(f"{_quote(field)} {order}")
+            self._auto_index([field])
+        return ", ".join(parts)
+
+    def _auto_index(self, fields):
+        indexed = self.indexed_fields()
+        for field in set(fields):
+            if field in indexed or field in self._auto_indexed:
+                continue
+            self._query_counts[field] += 1
+            if self._query_counts[field] >= self.AUTO_INDEX_AFTER:
+                self._auto_indexed.add(field)
+                self._request_auto_index(field)
+
+    def _request_auto_index(self, field):
+        if not self._is_writable():
+            self.failed_auto_indexes.add(field)
+            return
+
+        keys = [(field, ASCENDING)]
+        sql = self._index_sql(keys, False, f"auto_{self.table}_{field}")
+        path = self.conn.execute("PRAGMA database_list").fetchone()[2]
+        if not path:
+            # in-memory database: no second connection, built by the next write
+            self._pending_indexes.append((keys, sql))
+            return
+
+        with self._builder_lock:
+            self._index_queue.append((field, sql))
+            if self._index_builder is None:
+                self._index_builder = threading.Thread(
+                    target=self._build_auto_indexes, args=(path,), daemon=True
+                )
+                self._index_builder.start()
+
+    def _is_writable(self):
+        """False for a read-only connection (mode=ro, query_only, read-only file)."""
+        if self._writable is None:
+            try:
+                # a schema change that is rolled back right away
+                self.conn.execute("SAVEPOINT writable_probe")
+                try:
+                    self.conn.execute('CREATE TABLE main."_writable_probe" (x)')
+                finally:
+                    self.conn.execute("ROLLBACK TO writable_probe")
+                    self.conn.execute("RELEASE writable_probe")
+                self._writable = True
+            except sqlite3.OperationalError as e:
+                if "locked" in str(e):
+                    return False  # another writer; ask again next time
+                self._writable = False
+        return self._writable
+
+    def _build_auto_indexes(self, path):
+        """Builder thread: create the queued indexes on a connection of its own."""
+        conn = None
+        while True:
+            with self._builder_lock:
+                if not self._index_queue:
+                    self._index_builder = None
+                    break
+                field, sql = self._index_queue.pop(0)
+            try:
+                if conn is None:
+                    conn = sqlite3.connect(path, timeout=30)
+                with conn:
+                    conn.execute(sql)
+            except sqlite3.Error as e:
+                print(f"⚠️ Could not index {self.table}.{field}: {e}")
+                self.failed_auto_indexes.add(field)
             else:
-                results.append(row_dict)
-        return results
+                self._indexed = None  # re-read, with the new index, by the next query
+        if conn is not None:
+            conn.close()
+
+    # writes
+
+    def insert_one(self, document):
+        """Insert document; like pymongo, an _id is added to it when missing."""
+        with self.conn:
+            inserted_id = self._insert(document)
+        return InsertOneResult(inserted_id)
+
+    def insert_many(self, documents):
+        documents = list(documents)
+        with self.conn:
+            inserted_ids = [self._insert(doc) for doc in documents]
+        return InsertManyResult(inserted_ids)
+
+    def update_one(self, filter, update, upsert=False):
+        with self.conn:
+            return self._update(filter, update, upsert)
+
+    def delete_one(self, filter):
+        with self.conn:
+            return DeleteResult(self._delete(filter))
+
+    def bulk_write(self, requests):
+        """
+        Apply InsertOne/UpdateOne/DeleteOne requests in one transaction;
+        if any of them fails, none are applied.
+        """
+        result = BulkWriteResult()
+        with self.conn:
+            for i, request in enumerate(requests):
+                if isinstance(request, InsertOne):
+                    self._insert(request.document)
+                    result.inserted_count += 1
+                elif isinstance(request, UpdateOne):
+                    update = self._update(
+                        request.filter, request.update, request.upsert
+                    )
+                    result.matched_count += update.matched_count
+                    result.modified_count += update.modified_count
+                    if update.upserted_id is not None:
+                        result.upserted_ids[i] = update.upserted_id
+                elif isinstance(request, DeleteOne):
+                    result.deleted_count += self._delete(request.filter)
+                else:
+                    raise TypeError(f"Unsupported bulk write request {request!r}")
+        return result
+
+    def _insert(self, document):
+        if "_id" not in document and ("_id" in self.columns or not self.columns):
+            document["_id"] = str(uuid.uuid4())
+        self._ensure_columns([document])
+
+        fields = [f for f in document if document[f] is not None]
+        if not fields:
+            cursor = self.conn.execute(
+                f"INSERT INTO {_quote(self.table)} DEFAULT VALUES"
+            )
+            return document.get("_id", cursor.lastrowid)
+        cursor = self.conn.execute(
+            f"INSERT INTO {_quote(self.table)} "
+            f"({', '.join(_quote(f) for f in fields)}) "
+            f"VALUES ({', '.join('?' * len(fields))})",
+            [_to_sql(document[f]) for f in fields],
+        )
+        return document.get("_id", cursor.lastrowid)
+
+    def _first_rowid(self, filter):
+        where, params = self._where(filter, auto_index=False)
+        row = self.conn.execute(
+            f"SELECT rowid FROM {_quote(self.table)} WHERE {where} LIMIT 1", params
+        ).fetchone()
+        return row[0] if row else None
+
+    def _update(self, filter, update, upsert):
+        if not update or not all(op.startswith("$") for op in update):
+            raise ValueError("update only works with $ operators")
+        unsupported = set(update) - {"$set", "$unset"}
+        if unsupported:
+            raise ValueError(f"Unsupported update operator(s) {sorted(unsupported)}")
+        to_set = dict(update.get("$set", {}))
+        to_unset = [f for f in update.get("$unset", {}) if f in self.columns]
+
+        rowid = self._first_rowid(filter) if self.columns else None
+        if rowid is None:
+            if not upsert:
+                return UpdateResult(0, 0)
+            # the new document: the filter's equality fields plus $set
+            document = {
+                field: value
+                for field, value in (filter or {}).items()
+                if not field.startswith("$") and not isinstance(value, dict)
+            }
+            document.update(to_set)
+            return UpdateResult(0, 0, upserted_id=self._insert(document))
+
+        self._ensure_columns([to_set])
+        # None for a field without a column: it is already missing everywhere
+        changes = {
+            f: _to_sql(v) for f, v in to_set.items() if f in self.columns
+        }
+        changes.update({f: None for f in to_unset})
+        if not changes:
+            return UpdateResult(1, 0)
+
+        fields = list(changes)
+        current = self.conn.execute(
+            f"SELECT {', '.join(_quote(f) for f in fields)} "
+            f"FROM {_quote(self.table)} WHERE rowid = ?",
+            [rowid],
+        ).fetchone()
+        if list(current) == [changes[f] for f in fields]:
+            return UpdateResult(1, 0)
+
+        self.conn.execute(
+            f"UPDATE {_quote(self.table)} "
+            f"SET {', '.join(f'{_quote(f)} = ?' for f in fields)} WHERE rowid = ?",
+            [changes[f] for f in fields] + [rowid],
+        )
+        return UpdateResult(1, 1)
 
-    def find_one(self, query=None):
-        results = self.find(query)
-        return results[0] if results else None
+    def _delete(self, filter):
+        if not self.columns:
+            return 0
+        rowid = self._first_rowid(filter)
+        if rowid is None:
+            return 0
+        self.conn.execute(f"DELETE FROM {_quote(self.table)} WHERE rowid = ?", [rowid])
+        return 1
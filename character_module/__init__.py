@@ -1,7 +1,25 @@
-from .visual_app import CharacterApp
-from .visual_character_module import Character
-from .character_store import CharacterStore
-from .db import get_data_stores
-from .SQLiteCollection import SQLiteCollectionWrapper
+# names are imported on first access so the stores can be used headless
+# without pulling in PySide6
+import importlib
 
-__all__ = ["CharacterApp", "Character", "CharacterStore", "get_data_stores", "SQLiteCollectionWrapper"]
+_EXPORTS = {
+    "CharacterApp": ".visual_app",
+    "Character": ".visual_character_module",
+    "CharacterStore": ".character_store",
+    "get_data_stores": ".db",
+    "SQLiteCollectionWrapper": ".SQLiteCollection",
+    "InsertOne": ".operations",
+    "UpdateOne": ".operations",
+    "DeleteOne": ".operations",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -1,49 +1,175 @@
 import json
 import os
 
+from .cursors import IterCursor, matches
+from .indexes import HashIndex, SortedIndex, candidate_ids
+from .operations import InsertOneResult, UpdateResult, DeleteResult
+
+
+def write_json_atomic(path, data):
+    """Write data as JSON to a temp file next to path, then rename it over path."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_json_store(path):
+    """
+    Characters saved by a JSON-mode CharacterStore: the snapshot at path with
+    the change log at path.log replayed on top. Returns (data, log_entries).
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        data = {}
+
+    entries = 0
+    try:
+        with open(f"{path}.log", "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    print("⚠️ Skipping a torn entry in the character log.")
+                    continue  # the last write was cut off by a crash
+                if entry["op"] == "set":
+                    data[entry["_id"]] = entry["doc"]
+                else:
+                    data.pop(entry["_id"], None)
+                entries += 1
+    except FileNotFoundError:
+        pass
+    return data, entries
+
+
+def save_json_store(path, data):
+    """Replace the snapshot at path with data and drop its change log."""
+    write_json_atomic(path, data)
+    try:
+        os.remove(f"{path}.log")
+    except FileNotFoundError:
+        pass
+
 
 class CharacterStore:
-    def __init__(self, db=None, fallback_file=None):
+    """
+    Characters in a Mongo-like collection (db), or in JSON files when db is
+    None.
+
+    In JSON mode fallback_file is a snapshot and fallback_file.log an
+    append-only JSON-lines log: every write appends one line for the record
+    it changed. Once the log has more entries than COMPACT_AFTER and than
+    the store has characters, it is folded into a new snapshot, which is
+    written to a temp file and renamed into place. Nothing is read until the
+    characters are first used.
+
+    INDEXES declares the secondary indexes (field -> HashIndex for equality,
+    SortedIndex for ranges). In JSON mode they are kept in memory and used
+    by find/find_one; with a db, the same fields get indexes on the
+    collection.
+    """
+
+    COMPACT_AFTER = 1000
+
+    INDEXES = {
+        "name": HashIndex,
+        "handle": HashIndex,
+        "role": HashIndex,
+        "last_updated": SortedIndex,
+        "age": SortedIndex,
+    }
+
+    def __init__(self, db=None, fallback_file=None, indexes=None):
         self.db = db
         self.use_db = db is not None
         self.fallback_file = fallback_file
+        index_kinds = self.INDEXES if indexes is None else indexes
 
-        if not self.use_db:
+        self._data = None
+        self._log_entries = 0
+        if self.use_db:
+            self.indexes = {}
+            self._create_db_indexes(index_kinds)
+        else:
+            self.indexes = {field: kind(field) for field, kind in index_kinds.items()}
+            self.log_file = f"{self.fallback_file}.log"
             self._ensure_file()
-            print("Opening JSON...")
-            with open(self.fallback_file, "r") as f:
-                self.data = json.load(f)
+
+    def _create_db_indexes(self, index_kinds):
+        for field in index_kinds:
+            try:
+                self.db.create_index(field)
+            except Exception as e:
+                print(f"⚠️ Could not create an index on {field}: {e}")
 
     def _ensure_file(self):
         if not os.path.exists(self.fallback_file):
             print("❌ No JSON file found. Creating...")
-            with open(self.fallback_file, "w") as f:
-                json.dump({}, f, indent=4)
+            write_json_atomic(self.fallback_file, {})
+
+    @property
+    def data(self):
+        """_id -> character (JSON mode), loaded on first use."""
+        if self._data is None:
+            print("Opening JSON...")
+            self._data, self._log_entries = load_json_store(self.fallback_file)
+            for _id, char in self._data.items():
+                char.setdefault("_id", _id)  # older upserts stored it only as the key
+            for index in self.indexes.values():
+                index.build(self._data.values())
+            if self._log_is_torn():
+                self.compact()  # appending after a cut-off line would corrupt it
+            else:
+                self._compact_if_needed()
+        return self._data
+
+    def mirrors_file(self, path):
+        """True if this store keeps its characters in the JSON file at path."""
+        return not self.use_db and os.path.abspath(path) == os.path.abspath(
+            self.fallback_file
+        )
 
-    def find(self):
+    def find(self, query=None, projection=None):
+        """Lazy cursor over the matching characters (pymongo's in Mongo mode)."""
         if self.use_db:
-            return self.db.find()
-        return self.data.values()
+            return self.db.find(query or {}, projection)
+        return IterCursor(lambda: self._candidates(query), query, projection)
 
     def find_one(self, query):
         if self.use_db:
             return self.db.find_one(query)
 
-        key = query.get("_id") or query.get("name")
-        if key in self.data:
-            return self.data[key]
-
-        for char in self.data.values():
-            if all(char.get(k) == v for k, v in query.items()):
+        for char in self._candidates(query):
+            if matches(char, query):
                 return char
         return None
 
+    def _candidates(self, query):
+        """Characters that may match query: an index's hits, or all of them."""
+        data = self.data  # loads the characters and builds the indexes
+        _id = (query or {}).get("_id")
+        if _id is not None and not isinstance(_id, dict):
+            char = data.get(_id)
+            return iter([char] if char is not None else [])
+
+        ids = candidate_ids(self.indexes, query)
+        if ids is None:
+            return iter(data.values())
+        return (data[i] for i in ids)
+
     def insert_one(self, doc):
         if self.use_db:
             return self.db.insert_one(doc)
 
+        self._unindex(doc["_id"])
         self.data[doc["_id"]] = doc
-        self._write_data()
+        self._index(doc)
+        self._log("set", doc["_id"], doc)
+        return InsertOneResult(doc["_id"])
 
     def update_one(self, query, update, upsert=False):
         if self.use_db:
@@ -51,22 +177,68 @@ class CharacterStore:
 
         _id = query.get("_id")
         if _id in self.data:
+            self._unindex(_id)
             self.data[_id].update(update.get("$set", {}))
+            self._index(self.data[_id])
+            self._log("set", _id, self.data[_id])
+            return UpdateResult(1, 1)
         elif upsert:
-            self.data[_id] = update.get("$set", {})
-        self._write_data()
+            self.data[_id] = {"_id": _id, **update.get("$set", {})}
+            self._index(self.data[_id])
+            self._log("set", _id, self.data[_id])
+            return UpdateResult(0, 0, upserted_id=_id)
+        return UpdateResult(0, 0)
 
     def delete_one(self, query):
         if self.use_db:
             return self.db.delete_one(query)
 
-        key = query.get("_id") or query.get("name")
-        if key and key in self.data:
-            del self.data[key]
-            self._write_data()
-            return True
-        return False
+        char = self.find_one(query)
+        if char is None:
+            return DeleteResult(0)
+        self._unindex(char["_id"])
+        del self.data[char["_id"]]
+        self._log("del", char["_id"])
+        return DeleteResult(1)
 
-    def _write_data(self):
-        with open(self.fallback_file, "w") as f:
-            json.dump(self.data, f, indent=4)
+    def _index(self, char):
+        for index in self.indexes.values():
+            index.add(char)
+
+    def _unindex(self, _id):
+        char = self.data.get(_id)
+        if char is not None:
+            for index in self.indexes.values():
+                index.remove(char)
+
+    # JSON persistence
+
+    def _log(self, op, _id, doc=None):
+        entry = {"op": op, "_id": _id}
+        if doc is not None:
+            entry["doc"] = doc
+        with open(self.log_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._log_entries += 1
+        self._compact_if_needed()
+
+    def _log_is_torn(self):
+        try:
+            with open(self.log_file, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                return f.read(1) != b"\n"
+        except OSError:
+            return False  # no log, or an empty one
+
+    def _compact_if_needed(self):
+        if self._log_entries > max(self.COMPACT_AFTER, len(self._data)):
+            self.compact()
+
+    def compact(self):
+        """Fold the log into a fresh snapshot."""
+        if self.use_db:
+            return
+        save_json_store(self.fallback_file, self.data)
+        self._log_entries = 0
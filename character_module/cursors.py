@@ -0,0 +1,235 @@
+import re
+import itertools
+from abc import ABC, abstractmethod
+
+ASCENDING = 1
+DESCENDING = -1
+
+
+def _sort_spec(key_or_list, direction=None):
+    """pymongo's sort() arguments as a list of (field, direction)."""
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction or ASCENDING)]
+    return [(field, d) for field, d in key_or_list]
+
+
+class BaseCursor(ABC):
+    """
+    Lazy result of a find(), with the chainable part of the pymongo Cursor
+    API: sort(), skip(), limit() and batch_size() set options and return the
+    cursor; nothing is read until the first next(). Options cannot change
+    once iteration has started.
+    """
+
+    DEFAULT_BATCH_SIZE = 500
+
+    def __init__(self, query=None, projection=None, sort=None, limit=0, skip=0):
+        self._query = query or {}
+        self._projection = projection
+        self._sort = _sort_spec(sort) if sort else None
+        self._limit = limit
+        self._skip = skip
+        self._batch_size = self.DEFAULT_BATCH_SIZE
+        self._iterator = None
+
+    # options
+
+    def _check_not_started(self):
+        if self._iterator is not None:
+            raise RuntimeError("cursor options cannot change after iteration started")
+
+    def sort(self, key_or_list, direction=None):
+        self._check_not_started()
+        self._sort = _sort_spec(key_or_list, direction)
+        return self
+
+    def skip(self, skip):
+        self._check_not_started()
+        self._skip = skip
+        return self
+
+    def limit(self, limit):
+        self._check_not_started()
+        self._limit = limit
+        return self
+
+    def batch_size(self, batch_size):
+        self._check_not_started()
+        self._batch_size = max(1, batch_size)
+        return self
+
+    # iteration
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._iterator is None:
+            self._iterator = self._execute()
+        return next(self._iterator)
+
+    def close(self):
+        """Release the underlying cursor; the cursor yields nothing more."""
+        if hasattr(self._iterator, "close"):
+            self._iterator.close()
+        self._iterator = iter(())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @abstractmethod
+    def _execute(self):
+        """Generator of the result documents, started by the first next()."""
+
+
+class SQLiteCursor(BaseCursor):
+    """Cursor over a SQLiteCollectionWrapper, fetching batch_size rows at a time."""
+
+    def __init__(self, collection, query=None, projection=None, **options):
+        super().__init__(query, projection, **options)
+        self.collection = collection
+
+    def _execute(self):
+        if not self.collection.columns:
+            return  # table not created yet
+        sql, params = self.collection.select_sql(
+            self._query, self._projection, self._sort, self._limit, self._skip
+        )
+        cursor = self.collection.conn.execute(sql, params)
+        try:
+            col_names = [desc[0] for desc in cursor.description]
+            while True:
+                rows = cursor.fetchmany(self._batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield self.collection.row_to_doc(col_names, row)
+        finally:
+            cursor.close()
+
+
+class IterCursor(BaseCursor):
+    """
+    Cursor over documents held in Python (the JSON store). Filtering, skip
+    and limit stream over the source; sort() has to collect the matching
+    documents first.
+    """
+
+    def __init__(self, source, query=None, projection=None, **options):
+        """source is a callable returning a fresh iterator of documents."""
+        super().__init__(query, projection, **options)
+        self.source = source
+
+    def _execute(self):
+        docs = (doc for doc in self.source() if matches(doc, self._query))
+        if self._sort:
+            docs = sort_documents(docs, self._sort)
+        stop = self._skip + self._limit if self._limit else None
+        for doc in itertools.islice(docs, self._skip, stop):
+            yield project(doc, self._projection)
+
+
+# python-side query evaluation, same operators as the SQL QueryCompiler
+
+
+def _compare(op, value, target):
+    if op == "$eq":
+        return value == target
+    if op == "$ne":
+        return value != target
+    if value is None or target is None:
+        # missing values only satisfy $gte/$lte against None
+        return value is None and target is None and op in ("$gte", "$lte")
+    try:
+        if op == "$gt":
+            return value > target
+        if op == "$gte":
+            return value >= target
+        if op == "$lt":
+            return value < target
+        if op == "$lte":
+            return value <= target
+    except TypeError:
+        return False  # Mongo does not compare across types either
+    raise ValueError(f"Unsupported query operator {op}")
+
+
+def _field_matches(value, condition):
+    if not isinstance(condition, dict) or not any(
+        key.startswith("$") for key in condition
+    ):
+        return value == condition
+
+    for op, target in condition.items():
+        if op == "$in":
+            if value not in target:
+                return False
+        elif op == "$nin":
+            if value in target:
+                return False
+        elif op == "$regex":
+            flags = re.IGNORECASE if "i" in condition.get("$options", "") else 0
+            if value is None or not re.search(target, str(value), flags):
+                return False
+        elif op == "$options":
+            continue
+        elif not _compare(op, value, target):
+            return False
+    return True
+
+
+def matches(doc, query):
+    """True if doc satisfies the Mongo-style filter query."""
+    for field, condition in (query or {}).items():
+        if field == "$and":
+            if not all(matches(doc, sub) for sub in condition):
+                return False
+        elif field == "$or":
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+        elif field.startswith("$"):
+            raise ValueError(f"Unsupported query operator {field}")
+        elif not _field_matches(doc.get(field), condition):
+            return False
+    return True
+
+
+def sort_key(value):
+    # Mongo's order across types: null, numbers, strings, everything else
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    return (3, str(value))
+
+
+def sort_documents(docs, sort):
+    """Sort docs by a list of (field, direction)."""
+    docs = list(docs)
+    for field, direction in reversed(sort):  # stable sorts, last key first
+        docs.sort(
+            key=lambda doc: sort_key(doc.get(field)),
+            reverse=direction == DESCENDING,
+        )
+    return docs
+
+
+def project(doc, projection):
+    if not projection:
+        return doc
+    if not isinstance(projection, dict):
+        projection = {field: 1 for field in projection}
+
+    included = [f for f, on in projection.items() if on and f != "_id"]
+    if included:
+        fields = included
+        if projection.get("_id", 1):
+            fields = ["_id"] + fields
+        return {f: doc[f] for f in fields if f in doc}
+    excluded = {f for f, on in projection.items() if not on}
+    return {k: v for k, v in doc.items() if k not in excluded}
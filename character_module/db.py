@@ -10,6 +10,7 @@ print(os.path.realpath(__file__))
 # Default path to local JSON data:
 DEFAULT_JSON_FILE = "data/characters.json"
 DEFAULT_SQLITE_FILE = "data/cyberpunk.db"
+CHARACTER_TABLE = "characters"
 
 # globals:
 client = None
@@ -62,36 +63,41 @@ def get_data_stores():
         if "characters" in collections:
             col_dict["character_store"] = CharacterStore(collections["characters"])
     else:
-        col_dict["character_store"] = CharacterStore(fallback_file=DEFAULT_JSON_FILE)
-        
-    if not collections:
         sqlite_conn = connect_to_sqlite()
-        cursor = sqlite_conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        sqlite_tables = [t[0] for t in cursor.fetchall()]
-
         item_store = {}
-        for tname in sqlite_tables:
-
-            item_store[tname] = SQLiteCollectionWrapper(sqlite_conn, tname)
-            # data = list(cursor.execute(f"SELECT * FROM {tname}"))
-            # col_names = [description[0] for description in cursor.description]
-            # data_list = []
-            # for item in data:
-            #     item_dict = {}
-            #     for i in range(len(col_names)):
-            #         item_dict[col_names[i]] = item[i]
-            #     data_list.append(item_dict)
-            # items_store[tname] = data_list
+        if sqlite_conn is not None:
+            cursor = sqlite_conn.cursor()
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+            sqlite_tables = [t[0] for t in cursor.fetchall()]
+
+            for tname in sqlite_tables:
+                if tname == CHARACTER_TABLE:
+                    continue
+                item_store[tname] = SQLiteCollectionWrapper(sqlite_conn, tname)
 
         col_dict["items_store"] = item_store
 
+        # characters go into the same SQLite file unless CHARACTER_FALLBACK=json
+        use_json = os.getenv("CHARACTER_FALLBACK", "").lower() == "json"
+        if sqlite_conn is None or use_json:
+            col_dict["character_store"] = CharacterStore(
+                fallback_file=DEFAULT_JSON_FILE
+            )
+        else:
+            col_dict["character_store"] = CharacterStore(
+                SQLiteCollectionWrapper(sqlite_conn, CHARACTER_TABLE)
+            )
+
     return col_dict
 
 
 def connect_to_sqlite():
     try:
         conn = sqlite3.connect(DEFAULT_SQLITE_FILE)
+        # WAL: writes append to a log instead of rewriting pages in place, and
+        # readers are not blocked while a character is saved
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
 
         print("✅ Connected to SQLite (fallback db)")
 
@@ -0,0 +1,149 @@
+"""
+In-memory secondary indexes for the JSON-mode CharacterStore.
+
+Both kinds map a field's values to character _ids and answer part of a
+Mongo-style condition with a candidate set of _ids, or None when they cannot
+help. Candidates may be a superset (conditions the index does not know are
+ignored); the caller still checks each document against the full query.
+"""
+
+from bisect import bisect_left, bisect_right
+
+from .cursors import sort_key
+
+UNBOUNDED = object()
+
+
+def _hashable(value):
+    if isinstance(value, list):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    return value
+
+
+def _operators(condition):
+    """condition as {op: value}; a plain value means $eq."""
+    if isinstance(condition, dict) and any(k.startswith("$") for k in condition):
+        return condition
+    return {"$eq": condition}
+
+
+class HashIndex:
+    """Equality index: value -> _ids, for O(1) lookups with $eq and $in."""
+
+    def __init__(self, field):
+        self.field = field
+        self._ids = {}  # value -> {_id: None}, insertion ordered
+
+    def build(self, docs):
+        self._ids = {}
+        for doc in docs:
+            self.add(doc)
+
+    def add(self, doc):
+        key = _hashable(doc.get(self.field))
+        self._ids.setdefault(key, {})[doc["_id"]] = None
+
+    def remove(self, doc):
+        key = _hashable(doc.get(self.field))
+        ids = self._ids.get(key)
+        if ids is not None:
+            ids.pop(doc["_id"], None)
+            if not ids:
+                del self._ids[key]
+
+    def lookup(self, condition):
+        ops = _operators(condition)
+        if "$eq" in ops:
+            return list(self._ids.get(_hashable(ops["$eq"]), ()))
+        if "$in" in ops:
+            found = {}
+            for value in ops["$in"]:
+                found.update(self._ids.get(_hashable(value), {}))
+            return list(found)
+        return None
+
+
+class SortedIndex:
+    """Ordered index for $gt/$gte/$lt/$lte ranges (and equality) on a field."""
+
+    def __init__(self, field):
+        self.field = field
+        self._keys = []  # sort keys, ascending
+        self._ids = []  # _id at the same position
+
+    def build(self, docs):
+        pairs = sorted(
+            ((sort_key(doc.get(self.field)), doc["_id"]) for doc in docs),
+            key=lambda pair: pair[0],
+        )
+        self._keys = [key for key, _ in pairs]
+        self._ids = [_id for _, _id in pairs]
+
+    def add(self, doc):
+        key = sort_key(doc.get(self.field))
+        pos = bisect_right(self._keys, key)
+        self._keys.insert(pos, key)
+        self._ids.insert(pos, doc["_id"])
+
+    def remove(self, doc):
+        key = sort_key(doc.get(self.field))
+        start = bisect_left(self._keys, key)
+        end = bisect_right(self._keys, key)
+        for pos in range(start, end):
+            if self._ids[pos] == doc["_id"]:
+                del self._keys[pos]
+                del self._ids[pos]
+                return
+
+    def lookup(self, condition):
+        ops = _operators(condition)
+        if "$eq" in ops:
+            return self._between(ops["$eq"], True, ops["$eq"], True)
+        if "$in" in ops:
+            found = {}
+            for value in ops["$in"]:
+                found.update(dict.fromkeys(self._between(value, True, value, True)))
+            return list(found)
+
+        lower = upper = UNBOUNDED
+        lower_inclusive = upper_inclusive = True
+        if "$gt" in ops or "$gte" in ops:
+            lower_inclusive = "$gt" not in ops
+            lower = ops["$gt"] if "$gt" in ops else ops["$gte"]
+        if "$lt" in ops or "$lte" in ops:
+            upper_inclusive = "$lt" not in ops
+            upper = ops["$lt"] if "$lt" in ops else ops["$lte"]
+        if lower is UNBOUNDED and upper is UNBOUNDED:
+            return None
+        return self._between(lower, lower_inclusive, upper, upper_inclusive)
+
+    def _between(self, lower, lower_inclusive, upper, upper_inclusive):
+        start = 0
+        if lower is not UNBOUNDED:
+            key = sort_key(lower)
+            bisect = bisect_left if lower_inclusive else bisect_right
+            start = bisect(self._keys, key)
+        end = len(self._keys)
+        if upper is not UNBOUNDED:
+            key = sort_key(upper)
+            bisect = bisect_right if upper_inclusive else bisect_left
+            end = bisect(self._keys, key)
+        return self._ids[start:end]
+
+
+def candidate_ids(indexes, query):
+    """
+    The smallest candidate _id list any index gives for query's top-level
+    conditions, or None when no index applies.
+    """
+    best = None
+    for field, condition in (query or {}).items():
+        index = indexes.get(field)
+        if index is None:
+            continue
+        ids = index.lookup(condition)
+        if ids is not None and (best is None or len(ids) < len(best)):
+            best = ids
+    return best
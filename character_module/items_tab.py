@@ -1,3 +1,5 @@
+import itertools
+
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -11,6 +13,10 @@ from PySide6.QtWidgets import (
 
 
 class ItemsTab(QWidget):
+    # rows read from the collection cursor at a time; more are read when the
+    # table is scrolled to the bottom
+    BATCH_SIZE = 200
+
     def __init__(self, items_collection, columns=None):
         super().__init__()
 
@@ -29,6 +35,7 @@ class ItemsTab(QWidget):
         self.items_table.setSelectionBehavior(QTableWidget.SelectRows)
         self.items_table.setSelectionMode(QTableWidget.SingleSelection)
         self.items_table.cellClicked.connect(self.load_selected_item)
+        self.items_table.verticalScrollBar().valueChanged.connect(self.on_scroll)
         self.layout.addWidget(QLabel("Items"))
         self.layout.addWidget(self.items_table)
 
@@ -48,27 +55,49 @@ class ItemsTab(QWidget):
 
     def load_items_collection(self):
         self.items = []
+        self.cursor = None
         # self.items_list_widget.clear()
         self.items_table.setRowCount(0)
 
         try:
-            cursor = self.items_collection.find()
-            self.items = list(cursor)
-            self.items_table.setRowCount(len(self.items))
+            self.cursor = self.items_collection.find().batch_size(self.BATCH_SIZE)
+        except Exception as e:
+            print("Error loading items:", e)
+            return
+
+        header = self.items_table.horizontalHeader()
+        for i in range(len(self.columns)):
+            header.setSectionResizeMode(i, QHeaderView.Stretch)
 
-            for row, item in enumerate(self.items):
-                for col_idx, col_name in enumerate(self.columns):
-                    value = item.get(col_name, "")
-                    # special case: if value is ObjectId, convert to string
-                    value = str(value)
-                    self.items_table.setItem(row, col_idx, QTableWidgetItem(value))
+        self.load_more_items()
 
-            header = self.items_table.horizontalHeader()
-            for i in range(len(self.columns)):
-                header.setSectionResizeMode(i, QHeaderView.Stretch)
+    def load_more_items(self):
+        """Append the next batch of items from the cursor to the table."""
+        if self.cursor is None:
+            return
 
+        try:
+            batch = list(itertools.islice(self.cursor, self.BATCH_SIZE))
         except Exception as e:
             print("Error loading items:", e)
+            batch = []
+        if len(batch) < self.BATCH_SIZE:
+            self.cursor = None  # exhausted
+
+        start = len(self.items)
+        self.items.extend(batch)
+        self.items_table.setRowCount(len(self.items))
+
+        for row, item in enumerate(batch, start):
+            for col_idx, col_name in enumerate(self.columns):
+                value = item.get(col_name, "")
+                # special case: if value is ObjectId, convert to string
+                value = str(value)
+                self.items_table.setItem(row, col_idx, QTableWidgetItem(value))
+
+    def on_scroll(self, value):
+        if value >= self.items_table.verticalScrollBar().maximum() - 2:
+            self.load_more_items()
 
     def load_selected_item(self, row, column):
         if 0 <= row < len(self.items):
@@ -0,0 +1,64 @@
+"""
+Write operations and results for SQLiteCollectionWrapper, shaped like the
+pymongo classes of the same names so CharacterStore code works on both.
+"""
+
+
+class InsertOne:
+    def __init__(self, document):
+        self.document = document
+
+
+class UpdateOne:
+    def __init__(self, filter, update, upsert=False):
+        self.filter = filter
+        self.update = update
+        self.upsert = upsert
+
+
+class DeleteOne:
+    def __init__(self, filter):
+        self.filter = filter
+
+
+# results
+
+
+class InsertOneResult:
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+        self.acknowledged = True
+
+
+class InsertManyResult:
+    def __init__(self, inserted_ids):
+        self.inserted_ids = inserted_ids
+        self.acknowledged = True
+
+
+class UpdateResult:
+    def __init__(self, matched_count, modified_count, upserted_id=None):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_id = upserted_id
+        self.acknowledged = True
+
+
+class DeleteResult:
+    def __init__(self, deleted_count):
+        self.deleted_count = deleted_count
+        self.acknowledged = True
+
+
+class BulkWriteResult:
+    def __init__(self):
+        self.inserted_count = 0
+        self.matched_count = 0
+        self.modified_count = 0
+        self.deleted_count = 0
+        self.upserted_ids = {}  # operation index -> _id
+        self.acknowledged = True
+
+    @property
+    def upserted_count(self):
+        return len(self.upserted_ids)
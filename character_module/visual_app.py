@@ -13,6 +13,7 @@ from PySide6.QtWidgets import (
     QScrollArea,
     QTabWidget,
     QDialog,
+    QAbstractItemView,
 )
 from PySide6.QtGui import QPixmap
 from PySide6.QtCore import Qt, Signal
@@ -58,6 +59,9 @@ class CharacterApp(QWidget):
         self.pdf_generator = pdf_generator
         self.logger.debug("PDF Generator loaded")
 
+        # saved characters drop their cached sheets
+        Character.add_change_listener(self.pdf_generator.sheet_cache.invalidate)
+
         # Scroll area
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
@@ -117,6 +121,9 @@ class CharacterApp(QWidget):
         # character list
         self.list_widget = QListWidget()
         self.list_widget.setMaximumHeight(75)
+        self.list_widget.setSelectionMode(
+            QAbstractItemView.SelectionMode.ExtendedSelection
+        )
         self.list_widget.itemClicked.connect(self.load_selected_character)
         parent_layout.addWidget(self.list_widget)
 
@@ -211,6 +218,12 @@ class CharacterApp(QWidget):
         self.convert_btn = PointerButton("HTML")
         self.convert_btn.clicked.connect(self.convert_to_html)
 
+        self.roster_btn = PointerButton("Roster")
+        self.roster_btn.setToolTip(
+            "One PDF of the selected characters (all if fewer than two are selected)"
+        )
+        self.roster_btn.clicked.connect(self.print_roster)
+
         for b in (
             self.new_btn,
             self.edit_btn,
@@ -218,6 +231,7 @@ class CharacterApp(QWidget):
             self.delete_btn,
             self.print_btn,
             self.convert_btn,
+            self.roster_btn,
         ):
             # b.setCursor(QCursor(Qt.PointingHandCursor))
             btn_layout.addWidget(b)
@@ -414,11 +428,26 @@ class CharacterApp(QWidget):
         dlg.resizeEvent = resize_event
         dlg.exec()
 
+    def sheet_data(self):
+        """current_char as the PDF generator takes it (to_dict leaves out _id)."""
+        return {**self.current_char.to_dict(), "_id": self.current_char._id}
+
     def print_to_pdf(self):
-        self.pdf_generator.generate_character_sheet(self.current_char.to_dict())
+        self.pdf_generator.generate_character_sheet(self.sheet_data())
+
+    def print_roster(self):
+        rows = sorted(index.row() for index in self.list_widget.selectedIndexes())
+        if len(rows) > 1:
+            characters = [self.sorted_characters[row] for row in rows]
+        else:
+            characters = self.sorted_characters
+        if not characters:
+            QMessageBox.warning(self, "Error", "No characters to export")
+            return
+        self.pdf_generator.generate_roster(characters)
 
     def convert_to_html(self):
-        char_html = self.pdf_generator.generate_html(self.current_char.to_dict())
+        char_html = self.pdf_generator.generate_html(self.sheet_data())
         title = (
             self.current_char.handle
             if self.current_char.handle != "" or None
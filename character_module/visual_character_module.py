@@ -3,8 +3,13 @@ import uuid
 import json
 from bson.objectid import ObjectId
 
+from .character_store import load_json_store, save_json_store
+
 
 class Character:
+    # callables taking a character _id, run after it is saved or deleted
+    _change_listeners = []
+
     def __init__(self, store, data=None):
         self.store = store
         self._id = str(uuid.uuid4())
@@ -53,17 +58,36 @@ class Character:
     def save_to_store(self):
         self.last_updated = datetime.now(timezone.utc).isoformat() + "Z"
         self.store.update_one({"_id": self._id}, {"$set": self.to_dict()}, upsert=True)
+        self._notify_change()
 
     def delete_from_store(self):
         self.store.delete_one({"_id": self._id})
+        self._notify_change()
+
+    @classmethod
+    def add_change_listener(cls, listener):
+        """Call listener(_id) whenever a character is saved or deleted."""
+        if listener not in cls._change_listeners:
+            cls._change_listeners.append(listener)
+
+    @classmethod
+    def remove_change_listener(cls, listener):
+        if listener in cls._change_listeners:
+            cls._change_listeners.remove(listener)
+
+    def _notify_change(self):
+        for listener in list(self._change_listeners):
+            listener(self._id)
 
     @staticmethod
     def sync_bi_directional(store, file="data/characters.json"):
-        # load JSON
+        if store.mirrors_file(file):
+            return  # the store is this JSON file, nothing to sync
+
+        # load JSON (snapshot plus any log left by JSON mode)
         try:
-            with open(file, "r") as f:
-                json_data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
+            json_data, _ = load_json_store(file)
+        except json.JSONDecodeError:
             json_data = {}
 
         # load MongoDB Data
@@ -108,8 +132,7 @@ class Character:
                 char["_id"] = str(char["_id"])
 
         # write merged data back to JSON file
-        with open(file, "w") as f:
-            json.dump(merged_data, f, indent=4)
+        save_json_store(file, merged_data)
 
     def to_dict(self):
         return {k: v for k, v in self.__dict__.items() if k not in ("store", "_id")}
@@ -0,0 +1,209 @@
+"""
+Headless batch export of writer documents and character sheets (no Qt).
+
+    python export_cli.py documents --all
+    python export_cli.py documents --ids <doc_id> <doc_id> --format html
+    python export_cli.py characters --all --workers 8 --out exports/
+
+PDFs are rendered in a process pool; exports whose inputs have not changed
+since the last run are copied from the PDF cache instead.
+"""
+
+import os
+import re
+import sys
+import logging
+import argparse
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from output_module.pdf_renderer import PDFRenderer
+
+from writing_module.writing_store import WritingStore, default_data_dir
+from writing_module.sqlite_writing_store import SQLiteWritingStore
+
+UNSAFE_CHARS_RE = re.compile(r'[\\/:*?"<>|\x00-\x1f]+')
+
+
+def safe_filename(name):
+    return UNSAFE_CHARS_RE.sub("_", name).strip(" .") or "untitled"
+
+
+# sources: each yields (id, name, html before normalization, extra_styles, base_url)
+
+
+def open_writing_store(args, logger):
+    backend = (args.backend or os.getenv("WRITING_BACKEND", "files")).lower()
+    if backend == "sqlite":
+        return SQLiteWritingStore(
+            db_path=os.path.join(args.data_dir, "writing.db"), logger=logger
+        )
+    return WritingStore(base_dir=args.data_dir, logger=logger, journaled=True)
+
+
+def document_sources(renderer, store, ids):
+    doc_ids = ids or sorted(store.index, key=lambda d: store.index[d].get("title", ""))
+    missing = [doc_id for doc_id in doc_ids if doc_id not in store.index]
+    if missing:
+        raise ValueError(f"No such document(s): {', '.join(missing)}")
+    for doc_id in doc_ids:
+        title = store.index[doc_id].get("title") or doc_id
+        html_content = store.get_document(doc_id)
+        yield doc_id, title, html_content, renderer.DOCUMENT_STYLES, None
+
+
+def character_sources(renderer, ids):
+    # imported here: the character stores need pymongo, documents do not
+    from character_module.db import get_data_stores
+    from character_module.visual_character_module import Character
+
+    store = get_data_stores()["character_store"]
+    if store is None:
+        raise RuntimeError("No character store available")
+
+    wanted = set(ids or [])
+    for doc in store.find():
+        keys = {str(doc.get("_id")), doc.get("name"), doc.get("handle")}
+        if wanted and not wanted & keys:
+            continue
+        char_id = str(doc["_id"])
+        data = Character(store, doc).to_dict()  # the sheet fields, without _id
+        html_content = renderer.render_template(data)
+        name = data.get("handle") or data.get("name") or char_id
+        yield char_id, name, html_content, None, data.get("image_path")
+
+
+# exporting
+
+
+def _targets(sources, out_dir, fmt):
+    """Pair each source with a unique output path in out_dir."""
+    used_names = set()
+    for source_id, name, html_content, extra_styles, base_url in sources:
+        name = safe_filename(name)
+        if name in used_names:
+            name = f"{name} ({source_id[:8]})"
+        used_names.add(name)
+        yield out_dir / f"{name}.{fmt}", html_content, extra_styles, base_url
+
+
+def export_html(renderer, sources, out_dir, logger):
+    """Write normalized HTML (stylesheet linked, styles inlined); no WeasyPrint."""
+    written = 0
+    for target, html_content, extra_styles, _ in _targets(sources, out_dir, "html"):
+        fixed_html = renderer.soup_parser(
+            html_content, extra_styles=extra_styles, optimize_images=False
+        )["fixed_html"]
+        target.write_text(fixed_html, encoding="utf-8")
+        written += 1
+        logger.info(f"Wrote {target}")
+    return written, 0, 0
+
+
+def export_pdf(renderer, sources, out_dir, workers, logger):
+    """Render PDFs in a process pool, reusing cached PDFs for unchanged inputs."""
+    # imported here so HTML exports work without WeasyPrint installed
+    from output_module import render_worker
+
+    css_files = [str(renderer.css_file)]
+    written = cached = failed = 0
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=render_worker.init_worker,
+        initargs=(None, css_files),
+    ) as pool:
+        futures = {}
+        for target, html_content, extra_styles, base_url in _targets(
+            sources, out_dir, "pdf"
+        ):
+            cache_key = renderer.pdf_cache.key(
+                html_content,
+                css_files=css_files,
+                extra_styles=extra_styles,
+                base_url=base_url,
+            )
+            if renderer.pdf_cache.fetch(cache_key, target):
+                cached += 1
+                continue
+
+            fixed_html = renderer.soup_parser(html_content)["fixed_html"]
+            future = pool.submit(
+                render_worker.render_pdf,
+                fixed_html,
+                str(target),
+                css_files=css_files,
+                extra_styles=extra_styles,
+                base_url=base_url,
+            )
+            futures[future] = (target, cache_key)
+
+        for future in as_completed(futures):
+            target, cache_key = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Export of {target.name} failed: {e}")
+                target.unlink(missing_ok=True)
+                failed += 1
+                continue
+            renderer.pdf_cache.put(cache_key, target)
+            written += 1
+            logger.info(f"Wrote {target}")
+
+    return written, cached, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Export writer documents or character sheets without the GUI."
+    )
+    parser.add_argument("kind", choices=("documents", "characters"))
+    selection = parser.add_mutually_exclusive_group(required=True)
+    selection.add_argument("--all", action="store_true", help="export everything")
+    selection.add_argument(
+        "--ids", nargs="+", help="doc_ids, or character _ids/names/handles"
+    )
+    parser.add_argument("--format", choices=("pdf", "html"), default="pdf")
+    parser.add_argument("--out", type=Path, default=None, help="default: outputs/")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--data-dir", default=default_data_dir())
+    parser.add_argument("--backend", choices=("files", "sqlite"), default=None)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    logger = logging.getLogger("character_writing_app")
+
+    renderer = PDFRenderer(logger)
+    out_dir = args.out or renderer.outputs_dir
+
+    store = None
+    try:
+        if args.kind == "documents":
+            store = open_writing_store(args, logger)
+            sources = document_sources(renderer, store, args.ids)
+        else:
+            sources = character_sources(renderer, args.ids)
+
+        out_dir.mkdir(parents=True, exist_ok=True)
+        if args.format == "html":
+            written, cached, failed = export_html(renderer, sources, out_dir, logger)
+        else:
+            written, cached, failed = export_pdf(
+                renderer, sources, out_dir, max(1, args.workers), logger
+            )
+    except (ValueError, RuntimeError) as e:
+        logger.error(e)
+        return 2
+    finally:
+        if store is not None:
+            store.close()
+
+    logger.info(f"{written} written, {cached} unchanged (cached), {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+
+
+class DocumentListModel(QAbstractListModel):
+    """
+    Lazily paged list of documents for the file panel.
+
+    Rows are pulled from WritingStore.query_documents one page at a time
+    through canFetchMore/fetchMore, so the view only asks for what it is
+    about to show. A search result list (already ranked) can replace the
+    sorted listing with set_search_results().
+    """
+
+    def __init__(self, store, page_size=200, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.page_size = page_size
+
+        self.sort_by = "last_modified"
+        self.descending = True
+
+        self._ids = []
+        self._rows = {}  # doc_id -> row
+        self._cursor = None
+        self._exhausted = False
+        self._search_ids = None  # ranked doc_ids while a search is active
+
+    # Qt model api
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._ids)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._ids):
+            return None
+
+        doc_id = self._ids[index.row()]
+        if role == Qt.UserRole:
+            return doc_id
+
+        meta = self.store.index.get(doc_id, {})
+        if role == Qt.DisplayRole:
+            return f"{meta.get('title') or '(untitled)'} ({doc_id[:8]})"
+        if role == Qt.ToolTipRole:
+            return f"Last modified: {meta.get('last_modified', '')}"
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+
+        new_ids = [doc_id for doc_id in self._next_page() if doc_id not in self._rows]
+        if not new_ids:
+            return
+
+        first = len(self._ids)
+        self.beginInsertRows(QModelIndex(), first, first + len(new_ids) - 1)
+        for offset, doc_id in enumerate(new_ids):
+            self._rows[doc_id] = first + offset
+        self._ids.extend(new_ids)
+        self.endInsertRows()
+
+    # paging
+
+    def _next_page(self):
+        if self._search_ids is not None:
+            start = len(self._ids)
+            page = self._search_ids[start : start + self.page_size]
+            self._exhausted = start + self.page_size >= len(self._search_ids)
+            return page
+
+        page, self._cursor = self.store.query_documents(
+            sort_by=self.sort_by,
+            descending=self.descending,
+            limit=self.page_size,
+            cursor=self._cursor,
+        )
+        self._exhausted = self._cursor is None
+        return [doc_id for doc_id, _ in page]
+
+    # controls
+
+    def reload(self):
+        """Drop loaded rows and fetch the first page again."""
+        self.beginResetModel()
+        self._ids = []
+        self._rows = {}
+        self._cursor = None
+        self._exhausted = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def set_sort(self, sort_by, descending=False):
+        self.sort_by = sort_by
+        self.descending = descending
+        self.reload()
+
+    def set_search_results(self, doc_ids):
+        """Show only doc_ids in the given order; None returns to the sorted listing."""
+        self._search_ids = list(doc_ids) if doc_ids is not None else None
+        self.reload()
+
+    def doc_id_at(self, row):
+        return self._ids[row] if 0 <= row < len(self._ids) else None
+
+    def row_of(self, doc_id):
+        return self._rows.get(doc_id)
+
+    def update_document(self, doc_id):
+        """Refresh one row after a save, or show a newly created document."""
+        row = self._rows.get(doc_id)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+            return
+
+        if doc_id not in self.store.index or self._search_ids is not None:
+            return
+
+        # newest-first listing: a new document belongs on top
+        if self.sort_by == "last_modified" and self.descending:
+            self.beginInsertRows(QModelIndex(), 0, 0)
+            self._ids.insert(0, doc_id)
+            self._rows = {d: i for i, d in enumerate(self._ids)}
+            self.endInsertRows()
+        else:
+            self.reload()
+
+    def remove_document(self, doc_id):
+        row = self._rows.get(doc_id)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._ids[row]
+        self._rows = {d: i for i, d in enumerate(self._ids)}
+        if self._search_ids is not None and doc_id in self._search_ids:
+            self._search_ids.remove(doc_id)
+        self.endRemoveRows()
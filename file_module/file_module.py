@@ -2,22 +2,33 @@ from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
     QHBoxLayout,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
     QPushButton,
     QMessageBox,
     QApplication,
+    QLineEdit,
+    QComboBox,
 )
 
-from PySide6.QtCore import Signal, Qt
+from PySide6.QtCore import Signal, Qt, QItemSelectionModel
+
+from .document_list_model import DocumentListModel
 
 
 class FileModule(QWidget):
     """Right-side panel that manages the list of documents."""
 
-    delete_signal = Signal()
+    about_to_delete = Signal(str)  # doc_id, emitted before it is removed
+    delete_signal = Signal(str)  # doc_id
     merge_signal = Signal(list)  # list of selected doc_ids
 
+    # label -> (sort field, descending)
+    SORT_OPTIONS = {
+        "Recently modified": ("last_modified", True),
+        "Title": ("title", False),
+        "Font": ("font", False),
+    }
+
     def __init__(self, store, logger, on_doc_selected=None, on_new_doc=None):
         """
         :param on_doc_selected: callback(doc_id) when user clicks a document
@@ -33,11 +44,27 @@ class FileModule(QWidget):
 
         layout = QVBoxLayout(self)
 
-        # __document list__
-        self.doc_list = QListWidget()
+        # full-text search over all stored documents
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search documents…")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.textChanged.connect(self.apply_search)
+        layout.addWidget(self.search_input)
+
+        # sort order
+        self.sort_selector = QComboBox()
+        self.sort_selector.addItems(list(self.SORT_OPTIONS))
+        self.sort_selector.currentTextChanged.connect(self.change_sort)
+        layout.addWidget(self.sort_selector)
+
+        # __document list__ (paged model, rows are fetched as the view scrolls)
+        self.model = DocumentListModel(store=self.store, parent=self)
+        self.doc_list = QListView()
+        self.doc_list.setModel(self.model)
+        self.doc_list.setUniformItemSizes(True)
         # ExtendedSelection supports Shift-range and Ctrl-toggle behavior
-        self.doc_list.setSelectionMode(QListWidget.ExtendedSelection)  # multi-select
-        self.doc_list.itemClicked.connect(self.handle_doc_click)
+        self.doc_list.setSelectionMode(QListView.ExtendedSelection)  # multi-select
+        self.doc_list.clicked.connect(self.handle_doc_click)
         layout.addWidget(self.doc_list)
 
         # --buttons--
@@ -60,14 +87,43 @@ class FileModule(QWidget):
 
     def refresh_list(self):
         """Reload the list from storage."""
-        self.doc_list.clear()
-        for doc_id, meta in self.store.index.items():
-            title = meta.get("title", "(untitled)")
-            item = QListWidgetItem(f"{title} ({doc_id[:8]})")
-            item.setData(Qt.UserRole, doc_id)
-            self.doc_list.addItem(item)
-
-    def handle_doc_click(self, item):
+        if self.search_input.text().strip():
+            self.apply_search()
+        else:
+            self.model.reload()
+
+    def change_sort(self, label):
+        sort_by, descending = self.SORT_OPTIONS[label]
+        self.model.sort_by = sort_by
+        self.model.descending = descending
+        self.refresh_list()
+
+    def apply_search(self, text=None):
+        """Show only documents matching the search box (last word acts as a prefix)."""
+        text = self.search_input.text() if text is None else text
+        query = text.strip()
+        if not query:
+            self.model.set_search_results(None)
+            return
+
+        # search as you type: the word being typed matches by prefix
+        if not text.endswith((" ", '"', "*")) and query.count('"') % 2 == 0:
+            query += "*"
+        self.model.set_search_results(self.store.search(query))
+
+    def update_entry(self, doc_id):
+        """Refresh (or add) the list entry of one document after it was saved."""
+        if self.search_input.text().strip():
+            # the saved text may have changed whether it matches
+            self.apply_search()
+        else:
+            self.model.update_document(doc_id)
+
+    def selected_doc_ids(self):
+        rows = sorted(index.row() for index in self.doc_list.selectedIndexes())
+        return [self.model.doc_id_at(row) for row in rows]
+
+    def handle_doc_click(self, index):
         """
         If the user clicked without holding Shift/Ctrl/Meta, collapse any multi-selection
         to just the clicked item so a single click always loads that file immediately.
@@ -77,18 +133,16 @@ class FileModule(QWidget):
         multi_key_pressed = bool(
             modifiers & (Qt.ShiftModifier | Qt.ControlModifier | Qt.MetaModifier)
         )
+        selection = self.doc_list.selectionModel()
         # if no modifier and there are multiple items selected, restrict to the clicked one
-        if not multi_key_pressed and len(self.doc_list.selectedItems()) > 1:
-            target_id = item.data(Qt.UserRole)
+        if not multi_key_pressed and len(selection.selectedIndexes()) > 1:
             # block signals so re-selecting doesn't re-enter this handler
             self.doc_list.blockSignals(True)
-            for i in range(self.doc_list.count()):
-                list_item = self.doc_list.item(i)
-                list_item.setSelected(list_item.data(Qt.UserRole) == target_id)
+            selection.select(index, QItemSelectionModel.ClearAndSelect)
             self.doc_list.blockSignals(False)
         # only call on_doc_selected when exactly one item is selected
-        if self.on_doc_selected and len(self.doc_list.selectedItems()) == 1:
-            self.on_doc_selected(item.data(Qt.UserRole))
+        if self.on_doc_selected and len(selection.selectedIndexes()) == 1:
+            self.on_doc_selected(index.data(Qt.UserRole))
 
     def new_document(self):
         if self.on_new_doc:
@@ -97,11 +151,11 @@ class FileModule(QWidget):
 
     def delete_document(self):
         """Deletes selected document with confirmation."""
-        item = self.doc_list.currentItem()
-        if not item:
+        index = self.doc_list.currentIndex()
+        if not index.isValid():
             return
 
-        doc_id = item.data(Qt.UserRole)
+        doc_id = index.data(Qt.UserRole)
         title = self.store.index.get(doc_id, {}).get("title", "Untitled")
 
         confirm = QMessageBox.question(
@@ -112,18 +166,18 @@ class FileModule(QWidget):
         )
 
         if confirm == QMessageBox.Yes:
+            self.about_to_delete.emit(doc_id)
             self.store.delete_document(doc_id)
-            self.refresh_list()
-            self.delete_signal.emit()
+            self.model.remove_document(doc_id)
+            self.delete_signal.emit(doc_id)
 
     def handle_merge(self):
         """Emit selected document IDs for merging."""
-        selected_items = self.doc_list.selectedItems()
-        if len(selected_items) < 2:
+        doc_ids = self.selected_doc_ids()
+        if len(doc_ids) < 2:
             QMessageBox.warning(
                 self, "Merge Error", "Select at least 2 documents to merge."
             )
             return
 
-        doc_ids = [item.data(Qt.UserRole) for item in selected_items]
         self.merge_signal.emit(doc_ids)
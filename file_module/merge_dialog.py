@@ -14,6 +14,7 @@ class MergeDialog(QDialog):
         self.setWindowTitle("Order Documents for Merge")
         self.doc_ids = doc_ids
         self.store = store
+        self.compile_requested = False  # True when "Compile PDF" closed the dialog
 
         layout = QVBoxLayout(self)
 
@@ -36,10 +37,16 @@ class MergeDialog(QDialog):
         layout.addLayout(btn_layout)
 
         buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        compile_btn = buttons.addButton("Compile PDF", QDialogButtonBox.ActionRole)
+        compile_btn.clicked.connect(self.compile_pdf)
         buttons.accepted.connect(self.accept)
         buttons.rejected.connect(self.reject)
         layout.addWidget(buttons)
 
+    def compile_pdf(self):
+        self.compile_requested = True
+        self.accept()
+
     def move_up(self):
         row = self.order_list.currentRow()
         if row > 0:
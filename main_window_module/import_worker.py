@@ -0,0 +1,34 @@
+import threading
+
+from PySide6.QtCore import QThread, Signal
+
+from writing_module.bulk_import import BulkImporter
+
+
+class ImportWorker(QThread):
+    """Runs a BulkImporter off the GUI thread and reports through signals."""
+
+    progress = Signal(int, int, str)  # done, total, current item
+    import_finished = Signal(list)  # new doc_ids
+    import_failed = Signal(str)
+
+    def __init__(self, store, logger, folder, parent=None):
+        super().__init__(parent)
+        self.importer = BulkImporter(store, logger)
+        self.folder = folder
+        self.logger = logger
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        try:
+            doc_ids = self.importer.run(
+                self.folder, progress=self.progress.emit, cancel_event=self._cancel
+            )
+        except Exception as e:
+            self.logger.error(f"Bulk import failed: {e}")
+            self.import_failed.emit(str(e))
+            return
+        self.import_finished.emit(doc_ids)
@@ -1,4 +1,6 @@
+import os
 import uuid
+from pathlib import Path
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -10,20 +12,25 @@ from PySide6.QtWidgets import (
     QCheckBox,
     QLabel,
     QStatusBar,
+    QFileDialog,
+    QProgressDialog,
+    QMessageBox,
 )
 
 from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QAction, QKeySequence
 
-import fitz
-
 from character_module import CharacterApp
 
-from writing_module import WritingStore, WritingLayout
+from writing_module import WritingStore, SQLiteWritingStore, WritingLayout
 
 from file_module import FileModule, MergeDialog
 
-from output_module import PDFGenerator
+from output_module import PDFGenerator, BookCompiler
+
+from writing_module.bulk_import import pdf_to_html
+
+from .import_worker import ImportWorker
 
 
 class MainWindow(QMainWindow):
@@ -37,7 +44,7 @@ class MainWindow(QMainWindow):
         self.logger = logger
 
         # store for writer
-        self.store = WritingStore(logger=self.logger)
+        self.store = self._open_writing_store()
 
         self.pdf_generator = PDFGenerator(logger=self.logger)
 
@@ -51,6 +58,10 @@ class MainWindow(QMainWindow):
         file_menu = menu.addMenu("&File")
         file_menu.addAction(database_selector)
 
+        import_action = QAction("Import Folder…", self)
+        import_action.triggered.connect(self.import_folder)
+        file_menu.addAction(import_action)
+
         # splitter layout for sub modules
         splitter = QSplitter(Qt.Orientation.Horizontal)
 
@@ -80,13 +91,35 @@ class MainWindow(QMainWindow):
 
         # ✅ Connect the signal from WritingModule to refresh file list
         self.writing_pane.writing_tab.document_saved.connect(
-            self.file_pane.refresh_list
+            self.file_pane.update_entry
         )
-        self.file_pane.delete_signal.connect(
-            self.writing_pane.writing_tab.create_new_doc
+        self.file_pane.about_to_delete.connect(
+            self.writing_pane.writing_tab.discard_document
         )
         character_pane.save_html_signal.connect(self.file_pane.refresh_list)
 
+        # autosave state in the status bar
+        self.save_status = QLabel("")
+        self.statusBar().addPermanentWidget(self.save_status)
+        self.writing_pane.writing_tab.autosave.state_changed.connect(
+            self.show_save_state
+        )
+
+        # background PDF exports report in the status bar
+        render_service = self.pdf_generator.render_service
+        render_service.job_progress.connect(
+            lambda job, percent, message: self.statusBar().showMessage(
+                f"Exporting {job.label}: {percent}% {message}"
+            )
+        )
+        render_service.job_finished.connect(
+            lambda job: self.statusBar().showMessage(f"Exported {job.output_file}", 5000)
+        )
+        render_service.job_failed.connect(self.show_render_error)
+        render_service.job_cancelled.connect(
+            lambda job: self.statusBar().showMessage(f"Cancelled {job.label}", 5000)
+        )
+
         # connect the file_pane signal for merge
         self.file_pane.merge_signal.connect(self.merge_documents)
 
@@ -115,14 +148,20 @@ class MainWindow(QMainWindow):
     def load_document(self, doc_id):
         """Called when FileModule selects a document"""
         # store = WritingStore(logger=self.logger)
+        writing_tab = self.writing_pane.writing_tab
+        if doc_id != writing_tab.doc_id:
+            writing_tab.autosave.flush()  # keep edits to the previous document
+
         html = self.store.get_document(doc_id)
         meta = self.store.index.get(doc_id, {})
-        self.writing_pane.writing_tab.doc_id = doc_id
-        self.writing_pane.writing_tab.textEditSpace.setHtml(html or "")
-        self.writing_pane.writing_tab.title_input.setText(meta.get("title", ""))
-        self.writing_pane.writing_tab.load_font_and_size(
+        writing_tab.doc_id = doc_id
+        with writing_tab.autosave.paused():
+            writing_tab.textEditSpace.setHtml(html or "")
+        writing_tab.title_input.setText(meta.get("title", ""))
+        writing_tab.load_font_and_size(
             meta.get("font", "Garamond"), meta.get("font_size", "12")
         )
+        writing_tab.autosave.mark_clean()
 
     def create_new_document(self):
         """Called when FileModule creates a new doc."""
@@ -132,16 +171,20 @@ class MainWindow(QMainWindow):
         dialog = MergeDialog(doc_ids, self.store, self)
         if dialog.exec() == QDialog.Accepted:
             ordered_ids = dialog.ordered_doc_ids()
-            merged_html = ""
+            if dialog.compile_requested:
+                self.compile_book(ordered_ids)
+                return
 
+            parts = []
             for doc_id in ordered_ids:
                 html = self.store.get_document(doc_id)
-                merged_html += (
+                parts.append(
                     '<div id="editableDiv" contenteditable="true">'
                     + html
                     + "</div>"
                     + '<hr style="margin: 20px 0";>'
                 )  # simple divider
+            merged_html = "".join(parts)
 
             # ✅ handle merging external PDFs
             # outputs_dir = os.path.join(self.store.base_dir, "outputs")
@@ -169,22 +212,123 @@ class MainWindow(QMainWindow):
             self.load_document(new_id)
             self.file_pane.refresh_list()
 
+    def compile_book(self, ordered_ids):
+        """Export the ordered documents as one PDF with contents and page numbers."""
+        first_title = self.store.index.get(ordered_ids[0], {}).get("title") or "Book"
+        outputs_dir = Path(__file__).resolve().parent.parent / "outputs"
+        default_path = outputs_dir / f"{first_title}.pdf"
+        output_file, _ = QFileDialog.getSaveFileName(
+            self, "Compile PDF", str(default_path), "PDF (*.pdf)"
+        )
+        if not output_file:
+            return
+
+        progress_dlg = QProgressDialog("Rendering documents…", "Cancel", 0, 100, self)
+        progress_dlg.setWindowTitle("Compiling Book")
+        progress_dlg.setMinimumDuration(0)
+
+        compiler = BookCompiler(self.pdf_generator, self.store, self.logger, self)
+        self._book_compiler = compiler
+
+        def on_progress(percent, message):
+            progress_dlg.setValue(percent)
+            progress_dlg.setLabelText(message)
+
+        def on_finished(path):
+            progress_dlg.close()
+            self.statusBar().showMessage(f"Compiled {path}", 5000)
+
+        def on_failed(error):
+            progress_dlg.close()
+            QMessageBox.warning(self, "Compile failed", error)
+
+        compiler.progress.connect(on_progress)
+        compiler.finished.connect(on_finished)
+        compiler.failed.connect(on_failed)
+        compiler.cancelled.connect(progress_dlg.close)
+        progress_dlg.canceled.connect(compiler.cancel)
+        compiler.compile(ordered_ids, output_file, title=Path(output_file).stem)
+
     def pdf_to_html(self, pdf_path):
         """Convert a PDF file to HTML string (simplest approach)"""
 
         try:
-            doc = fitz.open(pdf_path)
-            html = ""
-            for page in doc:
-                html += page.get_text("html")
-            return html
-        except ImportError:
-            self.logger.error("PyMuPDF not installed. PDF to HTML skipped.")
+            return pdf_to_html(pdf_path)
+        except RuntimeError as e:
+            self.logger.error(f"PDF to HTML failed for {pdf_path}: {e}")
             return "<p>[PDF could not be converted to HTML]</p>"
 
+    def import_folder(self):
+        """Bulk import a folder of HTML/PDF files in the background."""
+        folder = QFileDialog.getExistingDirectory(self, "Import Folder")
+        if not folder:
+            return
+
+        progress_dlg = QProgressDialog("Scanning…", "Cancel", 0, 0, self)
+        progress_dlg.setWindowTitle("Importing")
+        progress_dlg.setMinimumDuration(0)
+
+        worker = ImportWorker(self.store, self.logger, folder, parent=self)
+        self._import_worker = worker
+
+        def on_progress(done, total, message):
+            progress_dlg.setMaximum(total)
+            progress_dlg.setValue(done)
+            progress_dlg.setLabelText(message)
+
+        def on_finished(doc_ids):
+            progress_dlg.close()
+            self.file_pane.refresh_list()
+            self.statusBar().showMessage(f"Imported {len(doc_ids)} documents", 5000)
+
+        def on_failed(error):
+            progress_dlg.close()
+            self.file_pane.refresh_list()
+            QMessageBox.warning(self, "Import failed", error)
+
+        worker.progress.connect(on_progress)
+        worker.import_finished.connect(on_finished)
+        worker.import_failed.connect(on_failed)
+        progress_dlg.canceled.connect(worker.cancel)
+        worker.start()
+
     def set_database(self):
         pass
 
+    def _open_writing_store(self):
+        """Pick the writing backend from WRITING_BACKEND (files or sqlite)."""
+        backend = os.getenv("WRITING_BACKEND", "files").lower()
+        if backend == "sqlite":
+            self.logger.info("Using SQLite writing store")
+            return SQLiteWritingStore(logger=self.logger, revisions=True, search=True)
+        compress = os.getenv("WRITING_COMPRESS", "0").lower() in ("1", "true", "yes")
+        return WritingStore(
+            logger=self.logger,
+            journaled=True,
+            compress=compress,
+            revisions=True,
+            search=True,
+        )
+
+    def show_save_state(self, state):
+        labels = {
+            "dirty": "Unsaved changes",
+            "saving": "Saving…",
+            "saved": "All changes saved",
+            "error": "Save failed (see log)",
+        }
+        self.save_status.setText(labels.get(state, state))
+
+    def show_render_error(self, job, error):
+        self.statusBar().clearMessage()
+        QMessageBox.warning(self, "Export failed", f"{job.label}: {error}")
+
+    def closeEvent(self, event):
+        self.writing_pane.writing_tab.autosave.shutdown()
+        self.pdf_generator.render_service.shutdown()
+        self.store.close()
+        super().closeEvent(event)
+
     def _finalize_layout(self):
         self.adjustSize()
         self.center_on_screen()
@@ -1,3 +1,22 @@
-from .pdf_generator import PDFGenerator
+# names are imported on first access so render workers and the headless
+# exporter can use the Qt-free modules without pulling in PySide6
+import importlib
 
-__all__ = ["PDFGenerator"]
+_EXPORTS = {
+    "PDFGenerator": ".pdf_generator",
+    "PDFRenderer": ".pdf_renderer",
+    "RenderService": ".render_service",
+    "RenderJob": ".render_service",
+    "BookCompiler": ".book_compiler",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
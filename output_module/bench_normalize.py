@@ -0,0 +1,134 @@
+"""
+Benchmark the streaming HTML normalizer against the old BeautifulSoup pass.
+
+    python -m output_module.bench_normalize [--paragraphs 20000] [--images 200]
+
+Builds a large document shaped like QTextEdit.toHtml() output, runs both
+implementations, checks that they produce the same document (compared after
+re-parsing both with BeautifulSoup, since the old one re-serialized every
+tag) and prints the timings.
+"""
+
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from .html_normalizer import normalize_html
+
+
+def legacy_soup_parser(html_string, css_file, extra_styles=None):
+    """PDFGenerator.soup_parser as it was before the streaming normalizer."""
+
+    # convert all <img> src paths to file:// URIs
+    soup = BeautifulSoup(html_string, "html.parser")
+    for img in soup.find_all("img"):
+
+        if not img["src"].startswith("file://"):
+            img_path = Path(img["src"]).resolve()
+            img["src"] = img_path.as_uri()
+
+        # ensure a style exists:
+
+        if not img.has_attr("style"):
+            img["style"] = "float: left; margin: 5px;"
+            img["width"] = "179"
+            img["height"] = "230"
+
+        # add class for styling
+        existing_classes = img.get("class", [])
+        if isinstance(existing_classes, str):  # just in case it's a string
+            existing_classes = existing_classes.split()
+        if "pdf-img" not in existing_classes:
+            existing_classes.append("pdf-img")
+        if "float" not in existing_classes:
+            float_dir = img.get("style", "").split(":")[1].strip()
+            if float_dir == "right;":
+                existing_classes.append("float-right")
+            elif float_dir == "left;":
+                existing_classes.append("float-left")
+        img["class"] = existing_classes
+
+    # prep head
+    head = soup.head or soup.new_tag("head")
+
+    # link to css
+    link_main = soup.new_tag(
+        "link", rel="stylesheet", href=Path(css_file).resolve().as_uri()
+    )
+    head.append(link_main)
+
+    # inject extra styles
+    if extra_styles:
+        style_tag = soup.new_tag("style")
+        style_tag.string = extra_styles
+        head.append(style_tag)
+
+    # ensure head is in soup
+    if not soup.head:
+        soup.html.insert(0, head)
+
+    # convert back to string:
+    return {"fixed_html": str(soup), "head": head}
+
+
+def qt_document(paragraphs, images, image_dir):
+    """A QTextEdit.toHtml() style document with inline spans and images."""
+    parts = [
+        '<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 4.0//EN" '
+        '"http://www.w3.org/TR/REC-html40/strict.dtd">\n'
+        '<html><head><meta name="qrichtext" content="1" /><meta charset="utf-8" />'
+        '<style type="text/css">\np, li { white-space: pre-wrap; }\n</style></head>'
+        "<body style=\" font-family:'Garamond'; font-size:12pt; font-weight:400;\">\n"
+    ]
+    every = max(1, paragraphs // max(1, images))
+    for i in range(paragraphs):
+        parts.append(
+            '<p style=" margin-top:0px; margin-bottom:0px; margin-left:0px; '
+            'margin-right:0px; -qt-block-indent:0; text-indent:0px;">'
+            f"Paragraph {i} of the manuscript &amp; some "
+            '<span style=" font-weight:700;">bold</span> and '
+            '<span style=" font-style:italic;">italic</span> text.'
+        )
+        if images and i % every == 0:
+            name = f"img{(i // every) % 10}.png"  # a few images used many times
+            side = "right" if i % 2 else "left"
+            parts.append(f'<img src="{image_dir / name}" style="float: {side};" />')
+        parts.append("</p>\n")
+    parts.append("<!-- <img src=\"commented-out.png\"> --></body></html>")
+    return "".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--paragraphs", type=int, default=20000)
+    parser.add_argument("--images", type=int, default=200)
+    args = parser.parse_args()
+
+    css_file = Path(__file__).resolve().parent / "style.css"
+    extra_styles = "h1 { text-align: center; }"
+
+    with tempfile.TemporaryDirectory() as image_dir:
+        html_string = qt_document(args.paragraphs, args.images, Path(image_dir))
+        print(f"document: {len(html_string) / 1e6:.1f} MB, {args.images} images")
+
+        start = time.perf_counter()
+        old = legacy_soup_parser(html_string, css_file, extra_styles)["fixed_html"]
+        old_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        new = normalize_html(html_string, css_file.as_uri(), extra_styles)["fixed_html"]
+        new_time = time.perf_counter() - start
+
+    same = str(BeautifulSoup(old, "html.parser")) == str(
+        BeautifulSoup(new, "html.parser")
+    )
+    print(f"BeautifulSoup: {old_time * 1000:8.1f} ms")
+    print(f"streaming:     {new_time * 1000:8.1f} ms  ({old_time / new_time:.0f}x)")
+    print(f"same output:   {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import shutil
+import tempfile
+from pathlib import Path
+from functools import partial
+
+from PySide6.QtCore import QObject, Signal
+
+from . import render_worker
+
+
+class BookCompiler(QObject):
+    """
+    Compiles several writer documents into one PDF book.
+
+    Every document is rendered on its own through the RenderService, so the
+    parts lay out in parallel across the pool instead of as one huge
+    WeasyPrint job; parts already in the PDF cache are copied instead of
+    rendered. Once all parts exist they are stitched with PyMuPDF, which adds
+    the table of contents, bookmarks and page numbers.
+    """
+
+    progress = Signal(int, str)  # percent, message
+    finished = Signal(str)  # output path
+    failed = Signal(str)
+    cancelled = Signal()
+
+    def __init__(self, pdf_generator, store, logger, parent=None):
+        super().__init__(parent)
+        self.pdf_generator = pdf_generator
+        self.render_service = pdf_generator.render_service
+        self.store = store
+        self.logger = logger
+
+        self._jobs = []
+        self._parts_dir = None
+        self._remaining = 0
+        self._total = 0
+        self._running = False
+
+    def compile(self, doc_ids, output_file, title="Book"):
+        """Start compiling doc_ids (in order) into output_file; returns immediately."""
+        if self._running:
+            raise RuntimeError("A book is already being compiled")
+
+        generator = self.pdf_generator
+        css_files = [generator.css_file]
+        extra_styles = generator.DOCUMENT_STYLES
+
+        self._running = True
+        self._jobs = []
+        self._parts_dir = Path(tempfile.mkdtemp(prefix="book_"))
+        self._output_file = Path(output_file)
+        self._title = title
+        self._titles = [
+            self.store.index.get(doc_id, {}).get("title") or "(untitled)"
+            for doc_id in doc_ids
+        ]
+        self._part_files = [
+            self._parts_dir / f"{i:04d}.pdf" for i in range(len(doc_ids))
+        ]
+        self._total = len(doc_ids)
+        self._remaining = len(doc_ids)
+
+        for doc_id, part_file in zip(doc_ids, self._part_files):
+            html_content = self.store.get_document(doc_id)
+            cache_key = generator.pdf_cache.key(
+                html_content, css_files=css_files, extra_styles=extra_styles
+            )
+            if generator.pdf_cache.fetch(cache_key, part_file):
+                self._remaining -= 1
+                continue
+
+            fixed_html = generator.soup_parser(html_string=html_content)["fixed_html"]
+            job = self.render_service.render_pdf(
+                fixed_html, part_file, css_files=css_files, extra_styles=extra_styles
+            )
+            job.finished.connect(partial(self._part_done, cache_key))
+            job.failed.connect(self._fail)
+            self._jobs.append(job)
+
+        self._report()
+        if self._remaining == 0:
+            self._stitch()
+
+    def cancel(self):
+        if not self._running:
+            return
+        for job in self._jobs:
+            job.cancel()
+        self._cleanup()
+        self.logger.info("Book compile cancelled")
+        self.cancelled.emit()
+
+    # steps
+
+    def _report(self, message="Rendering documents"):
+        done = self._total - self._remaining
+        percent = 90 * done // max(1, self._total)
+        self.progress.emit(percent, f"{message} ({done}/{self._total})")
+
+    def _part_done(self, cache_key, path):
+        if not self._running:
+            return
+        self.pdf_generator.pdf_cache.put(cache_key, path)
+        self._remaining -= 1
+        self._report()
+        if self._remaining == 0:
+            self._stitch()
+
+    def _stitch(self):
+        job = self.render_service.submit(
+            render_worker.stitch_pdfs,
+            [str(f) for f in self._part_files],
+            self._titles,
+            label=self._output_file.name,
+            output_file=self._output_file,
+            book_title=self._title,
+        )
+        job.progress.connect(
+            lambda percent, message: self.progress.emit(90 + percent // 10, message)
+        )
+        job.finished.connect(self._stitched)
+        job.failed.connect(self._fail)
+        self._jobs.append(job)
+
+    def _stitched(self, path):
+        self._cleanup()
+        self.logger.info(f"Compiled {self._total} documents into {path}")
+        self.progress.emit(100, "Done")
+        self.finished.emit(path)
+
+    def _fail(self, error):
+        if not self._running:
+            return
+        for job in self._jobs:
+            job.cancel()
+        self._cleanup()
+        self.failed.emit(error)
+
+    def _cleanup(self):
+        self._running = False
+        self._jobs = []
+        if self._parts_dir is not None:
+            shutil.rmtree(self._parts_dir, ignore_errors=True)
+            self._parts_dir = None
@@ -0,0 +1,158 @@
+import re
+from html import escape, unescape
+from pathlib import Path
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+# one pass over the document: comments are passed through untouched, <img>
+# tags are rewritten and the stylesheet link goes in before </head>
+TOKEN_RE = re.compile(
+    r"(?P<comment><!--.*?-->)|(?P<img><img\b[^>]*>)|(?P<head_end></head\s*>)",
+    re.IGNORECASE | re.DOTALL,
+)
+ATTR_RE = re.compile(
+    r"""([^\s"'<>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+)))?""",
+)
+HTML_OPEN_RE = re.compile(r"<html\b[^>]*>", re.IGNORECASE)
+HEAD_RE = re.compile(r"<head\b[^>]*>.*?</head\s*>", re.IGNORECASE | re.DOTALL)
+
+DEFAULT_IMG_STYLE = "float: left; margin: 5px;"
+
+
+def _parse_attrs(tag):
+    """Attributes of a start tag in document order (entity-decoded)."""
+    body = tag[4:].rstrip(">").rstrip("/")
+    attrs = {}
+    for name, dq, sq, bare in ATTR_RE.findall(body):
+        name = name.lower()
+        if name not in attrs:  # first occurrence wins, like html.parser
+            attrs[name] = unescape(dq or sq or bare)
+    return attrs
+
+
+def _render_img(attrs):
+    parts = []
+    for name, value in attrs.items():
+        parts.append(f'{name}="{escape(value, quote=True)}"')
+    return f"<img {' '.join(parts)}/>"
+
+
+def _css_px(value):
+    try:
+        return float(value) or None
+    except (TypeError, ValueError):
+        return None
+
+
+def local_image_path(src):
+    """The file an <img> src points at, or None for data:, http: and other URLs."""
+    scheme = urlparse(src).scheme
+    if scheme == "file":
+        return Path(url2pathname(urlparse(src).path))
+    if len(scheme) > 1:
+        return None
+    return Path(src).resolve()  # relative path, or a Windows drive letter
+
+
+def normalize_html(html_string, css_uri, extra_styles=None, image_assets=None):
+    """
+    Prepare writer/template HTML for WeasyPrint without building a DOM.
+
+    Does what PDFGenerator.soup_parser did with BeautifulSoup: every <img> is
+    fixed up by normalize_images, and the head gets a link to css_uri and
+    the extra styles.
+    Returns {"fixed_html": str, "head": str}.
+    """
+    resolved = {}
+    head_injection = f'<link rel="stylesheet" href="{escape(css_uri, quote=True)}"/>'
+    if extra_styles:
+        head_injection += f"<style>{extra_styles}</style>"
+
+    state = {"head": False}
+
+    def replace(match):
+        if match.group("comment"):
+            return match.group("comment")
+
+        if match.group("head_end"):
+            if state["head"]:
+                return match.group("head_end")
+            state["head"] = True
+            return head_injection + match.group("head_end")
+
+        return _fix_img(match.group("img"), image_assets, resolved)
+
+    fixed_html = TOKEN_RE.sub(replace, html_string)
+
+    if not state["head"]:
+        head = f"<head>{head_injection}</head>"
+        html_open = HTML_OPEN_RE.search(fixed_html)
+        if html_open:
+            pos = html_open.end()
+            fixed_html = fixed_html[:pos] + head + fixed_html[pos:]
+        else:
+            fixed_html = head + fixed_html
+
+    return {"fixed_html": fixed_html, "head": _head_markup(fixed_html)}
+
+
+def normalize_images(html_string, image_assets=None):
+    """
+    Fix up the <img> tags of html_string (a whole document or a fragment):
+    local srcs become file:// URIs, data: and remote URLs are left as they
+    are; images without a style get the default style and size, and every
+    one gets the pdf-img/float-* classes. Each distinct src is resolved
+    once. With an ImageAssetCache, local images point at print-sized copies.
+    """
+    resolved = {}
+
+    def replace(match):
+        if match.group("img"):
+            return _fix_img(match.group("img"), image_assets, resolved)
+        return match.group(0)
+
+    return TOKEN_RE.sub(replace, html_string)
+
+
+def _fix_img(tag, image_assets, resolved):
+    attrs = _parse_attrs(tag)
+
+    if "style" not in attrs:
+        attrs["style"] = DEFAULT_IMG_STYLE
+        attrs["width"] = "179"
+        attrs["height"] = "230"
+
+    src = attrs.get("src")
+    if src is not None and (image_assets or not src.startswith("file://")):
+        size = (_css_px(attrs.get("width")), _css_px(attrs.get("height")))
+        uri = resolved.get((src, size))
+        if uri is None:
+            path = local_image_path(src)
+            if path is None:
+                uri = src
+            else:
+                if image_assets is not None:
+                    path = image_assets.asset_path(path, *size)
+                uri = path.as_uri()
+            resolved[(src, size)] = uri
+        attrs["src"] = uri
+
+    classes = attrs.get("class", "").split()
+    if "pdf-img" not in classes:
+        classes.append("pdf-img")
+    if "float" not in classes:
+        # same rule as the old parser: the text between the first two colons
+        style_parts = attrs["style"].split(":")
+        float_dir = style_parts[1].strip() if len(style_parts) > 1 else ""
+        if float_dir == "right;":
+            classes.append("float-right")
+        elif float_dir == "left;":
+            classes.append("float-left")
+    attrs["class"] = " ".join(classes)
+
+    return _render_img(attrs)
+
+
+def _head_markup(html_string):
+    match = HEAD_RE.search(html_string)
+    return match.group(0) if match else ""
@@ -0,0 +1,156 @@
+import os
+import math
+import hashlib
+import threading
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+CSS_DPI = 96  # 1 CSS px = 1/96 in
+ASSET_EXTENSIONS = ("jpg", "png")  # what _make_asset writes
+
+
+class ImageAssetCache:
+    """
+    Print-sized copies of the images referenced by exported HTML.
+
+    Images are shown at most max_display_px CSS pixels wide in the PDF
+    (img.pdf-img max-width in style.css), so anything bigger than that at
+    the target DPI is wasted bytes and render time. Copies are resized with
+    Pillow, recompressed (JPEG for opaque images, PNG when there is alpha)
+    and stored under a name made of the source content hash and the target
+    size, so an unchanged image is only processed once.
+    """
+
+    def __init__(
+        self,
+        cache_dir,
+        dpi=200,
+        max_display_px=200,
+        jpeg_quality=85,
+        max_bytes=256 * 1024 * 1024,
+        logger=None,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.dpi = dpi
+        self.max_display_px = max_display_px
+        self.jpeg_quality = jpeg_quality
+        self.max_bytes = max_bytes
+        self.logger = logger
+
+        self._hashes = {}  # (path, size, mtime_ns) -> content hash
+        self._small = set()  # (hash, w, h) where the source is already small enough
+        self._lock = threading.Lock()
+
+    def asset_path(self, source, display_width=None, display_height=None):
+        """
+        Return the path to use for source shown at display_width x
+        display_height CSS px (either may be None); the source itself when
+        it is already small enough or cannot be processed.
+        """
+        source = Path(source)
+        try:
+            stat = source.stat()
+        except OSError:
+            return source
+
+        width_px = min(display_width or self.max_display_px, self.max_display_px)
+        target_w = math.ceil(width_px * self.dpi / CSS_DPI)
+        target_h = (
+            math.ceil(display_height * width_px / display_width * self.dpi / CSS_DPI)
+            if display_width and display_height
+            else None
+        )
+
+        with self._lock:
+            digest = self._content_hash(source, stat)
+            if (digest, target_w, target_h) in self._small:
+                return source
+            stem = self._stem(digest, target_w, target_h)
+            for ext in ASSET_EXTENSIONS:  # not a glob: it would match a stray .tmp
+                existing = self.cache_dir / f"{stem}.{ext}"
+                try:
+                    os.utime(existing)  # mark as recently used
+                except FileNotFoundError:
+                    continue
+                return existing
+
+            try:
+                asset = self._make_asset(source, digest, target_w, target_h)
+            except (OSError, ValueError, Image.DecompressionBombError) as e:
+                if self.logger:
+                    self.logger.warning(f"Could not optimize image {source}: {e}")
+                return source
+
+            if asset == source:
+                self._small.add((digest, target_w, target_h))
+            return asset
+
+    @staticmethod
+    def _stem(digest, target_w, target_h):
+        return f"{digest}_{target_w}x{target_h or 'auto'}"
+
+    def _content_hash(self, source, stat):
+        memo_key = (str(source), stat.st_size, stat.st_mtime_ns)
+        digest = self._hashes.get(memo_key)
+        if digest is None:
+            h = hashlib.sha1()
+            with open(source, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+            digest = self._hashes[memo_key] = h.hexdigest()[:24]
+        return digest
+
+    def _make_asset(self, source, digest, target_w, target_h):
+        with Image.open(source) as img:
+            img = ImageOps.exif_transpose(img)
+            if img.width <= target_w and (target_h is None or img.height <= target_h):
+                return source  # already small enough, keep the original bytes
+
+            img.thumbnail((target_w, target_h or img.height), Image.LANCZOS)
+
+            has_alpha = img.mode in ("RGBA", "LA") or (
+                img.mode == "P" and "transparency" in img.info
+            )
+            if has_alpha:
+                img = img.convert("RGBA")
+                ext, save_args = "png", {"optimize": True}
+            else:
+                img = img.convert("RGB")
+                ext = "jpg"
+                save_args = {
+                    "quality": self.jpeg_quality,
+                    "optimize": True,
+                    "progressive": True,
+                }
+
+            target = self.cache_dir / f"{self._stem(digest, target_w, target_h)}.{ext}"
+            tmp = target.with_suffix(".tmp")
+            img.save(tmp, format="PNG" if has_alpha else "JPEG", **save_args)
+            os.replace(tmp, target)
+
+        self._evict()
+        if self.logger:
+            self.logger.debug(
+                f"Optimized {source.name}: {source.stat().st_size} -> "
+                f"{target.stat().st_size} bytes"
+            )
+        return target
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for entry in self.cache_dir.iterdir():
+            if entry.suffix not in (".jpg", ".png"):
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry))
+            total += stat.st_size
+
+        entries.sort()  # oldest first
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
@@ -0,0 +1,127 @@
+import os
+import re
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+IMG_SRC_RE = re.compile(r"""<img\b[^>]*?\bsrc\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+
+
+class PDFCache:
+    """
+    Content-addressed cache of rendered PDFs.
+
+    The key is a hash of everything that affects the output: the source HTML,
+    the contents of the stylesheets, extra_styles, the base_url and the
+    size/mtime of every local image the HTML references. An export whose key
+    is already cached is a file copy instead of a WeasyPrint render. Entries
+    are evicted least-recently-used once the cache grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024, logger=None):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.logger = logger
+        self._lock = threading.Lock()
+
+    # keys
+
+    def key(self, html_content, css_files=(), extra_styles=None, base_url=None):
+        digest = hashlib.sha256()
+
+        def feed(label, data):
+            if isinstance(data, str):
+                data = data.encode("utf-8")
+            digest.update(f"{label}:{len(data)}:".encode())
+            digest.update(data)
+
+        feed("html", html_content)
+        for css_file in css_files:
+            try:
+                feed("css", Path(css_file).read_bytes())
+            except OSError:
+                feed("css-missing", str(css_file))
+        feed("extra", extra_styles or "")
+        feed("base", base_url or "")
+
+        for path in sorted(self.image_paths(html_content, base_url)):
+            try:
+                stat = os.stat(path)
+                feed("img", f"{path}|{stat.st_size}|{stat.st_mtime_ns}")
+            except OSError:
+                feed("img-missing", path)
+
+        return digest.hexdigest()
+
+    @staticmethod
+    def image_paths(html_content, base_url=None):
+        """Local files referenced by <img src>, resolved the way the renderer will."""
+        base_dir = None
+        if base_url and base_url.startswith("file:"):
+            base_path = Path(url2pathname(urlparse(base_url).path))
+            base_dir = base_path if base_path.is_dir() else base_path.parent
+
+        paths = set()
+        for src in IMG_SRC_RE.findall(html_content):
+            scheme = urlparse(src).scheme
+            if scheme == "file":
+                paths.add(url2pathname(urlparse(src).path))
+            elif not scheme or len(scheme) == 1:  # plain path or windows drive letter
+                path = Path(src)
+                if not path.is_absolute() and base_dir is not None:
+                    path = base_dir / path
+                paths.add(str(path.resolve()))
+        return paths
+
+    # entries
+
+    def _entry(self, key):
+        return self.cache_dir / f"{key}.pdf"
+
+    def fetch(self, key, output_file):
+        """Copy the cached PDF for key to output_file; False on a miss."""
+        entry = self._entry(key)
+        with self._lock:
+            try:
+                shutil.copyfile(entry, output_file)
+            except FileNotFoundError:
+                return False
+            os.utime(entry)  # mark as recently used
+        if self.logger:
+            self.logger.info(f"PDF cache hit: {Path(output_file).name}")
+        return True
+
+    def put(self, key, pdf_file):
+        """Store a rendered PDF under key and evict old entries if over budget."""
+        entry = self._entry(key)
+        tmp = entry.with_suffix(".tmp")
+        with self._lock:
+            shutil.copyfile(pdf_file, tmp)
+            os.replace(tmp, entry)
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            for entry in self.cache_dir.glob("*.pdf"):
+                entry.unlink(missing_ok=True)
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for entry in self.cache_dir.glob("*.pdf"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry))
+            total += stat.st_size
+
+        entries.sort()  # oldest first
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+            if self.logger:
+                self.logger.debug(f"PDF cache evicted {entry.name}")
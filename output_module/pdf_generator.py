@@ -1,8 +1,4 @@
-from pathlib import Path
-from weasyprint import HTML, CSS
-from jinja2 import Environment, FileSystemLoader
-from bs4 import BeautifulSoup
-from PySide6.QtWebEngineWidgets import QWebEngineView
+import os
 from PySide6.QtWidgets import (
     QDialog,
     QVBoxLayout,
@@ -12,76 +8,164 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import QUrl
 
+from .pdf_renderer import PDFRenderer
+from .render_service import RenderService
+from .pdf_preview import PDFPreviewDialog
 
-class PDFGenerator:
-    def __init__(self, logger):
-        self.base_dir = Path(__file__).resolve().parent  # folder containing this file
-        env = Environment(loader=FileSystemLoader(self.base_dir / "templates"))
-        self.template = env.get_template("template.html")
-        self.css_file = self.base_dir / "style.css"
-        self.logger = logger
+
+class PDFGenerator(PDFRenderer):
+    PREVIEW_MODES = ("raster", "html", "none")
+
+    def __init__(self, logger, render_service=None, preview_mode=None):
+        """
+        :param preview_mode: "raster" renders the PDF first and previews its
+            pages, "html" previews the HTML in a web view before rendering,
+            "none" exports without asking; defaults to $PDF_PREVIEW or "raster"
+        """
+        super().__init__(logger)
+
+        # WeasyPrint runs in worker processes so exports never block the GUI;
+        # each worker keeps style.css parsed and its fonts loaded between jobs
+        self.render_service = render_service or RenderService(
+            logger, css_files=[self.css_file]
+        )
+
+        self.preview_mode = (preview_mode or os.getenv("PDF_PREVIEW", "raster")).lower()
+        if self.preview_mode not in self.PREVIEW_MODES:
+            self.logger.warning(f"Unknown preview mode {self.preview_mode!r}")
+            self.preview_mode = "raster"
+        self._preview_dialog = None  # created on first use, then reused
 
         self.logger.info("PDF Generator initialized.")
 
     # methods:
 
-    def run_generator(self, html_path, output_path, extra_styles=None):
+    def run_generator(
+        self, html_path, output_path, extra_styles=None, html_content=None
+    ):
+        """Export a document to outputs/<output_path>.pdf; returns its RenderJob."""
         self.logger.info("pdf generator running")
 
-        html_file = self.base_dir.parent / "data" / "html" / html_path
         output_file = self.base_dir.parent / "outputs" / f"{output_path}.pdf"
 
-        # read the HTML content
-        with open(html_file, "r", encoding="utf-8") as f:
-            html_content = f.read()
+        # read the HTML content unless the caller already has it
+        if html_content is None:
+            html_content = self.read_html_file(html_path)
+
+        # nothing changed since the last accepted export: skip preview and render
+        cache_key = self.pdf_cache.key(
+            html_content, css_files=[self.css_file], extra_styles=extra_styles
+        )
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        if self.pdf_cache.fetch(cache_key, output_file):
+            return self.render_service.finished_job(output_file)
 
         fixed_html_dict = self.soup_parser(html_string=html_content)
         fixed_html = fixed_html_dict["fixed_html"]
 
-        # build stylesheet
-        stylesheets = [CSS(filename=str(self.css_file))]
-        if extra_styles:
-            stylesheets.append(CSS(string=extra_styles))  # overrides last
-
-        # preview
-        if not self.preview_html(fixed_html=fixed_html):
-            self.logger.info("user rejected preview")
-            return  # exit early
-
-        # generate PDF:
-        HTML(string=fixed_html).write_pdf(str(output_file), stylesheets=stylesheets)
-
-        self.logger.info("PDF generator finished")
+        # extra_styles go last so they override
+        return self._export(
+            fixed_html, output_file, cache_key, extra_styles=extra_styles
+        )
 
     def generate_character_sheet(self, data_dict):
+        """Export a character sheet to outputs/<handle>.pdf; returns its RenderJob."""
         self.logger.info("Starting pdf generation")
 
         # # check output dir:
         output_dir = self.base_dir.parent / "outputs"
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        fixed_html = self.generate_html(data_dict)
+        output_file = self.base_dir.parent / "outputs" / f"{data_dict['handle']}.pdf"
 
-        # pass html string
-        proceed = self.preview_html(fixed_html)
+        # unchanged character: straight to the cached PDF, no template render
+        sheet_key = self.sheet_cache.key(data_dict)
+        cache_key = self.sheet_cache.get(sheet_key, "pdf")
+        if cache_key and self.pdf_cache.fetch(cache_key, output_file):
+            return self.render_service.finished_job(output_file)
 
-        if not proceed:
-            self.logger.info("user declined pdf")
-            return
+        rendered_output = self.render_template(data_dict)
+        cache_key = self.pdf_cache.key(
+            rendered_output, css_files=[self.css_file], base_url=data_dict["image_path"]
+        )
+        self.sheet_cache.put(sheet_key, "pdf", cache_key)
+        if self.pdf_cache.fetch(cache_key, output_file):
+            return self.render_service.finished_job(output_file)
 
-        output_file = self.base_dir.parent / "outputs" / f"{data_dict['handle']}.pdf"
+        fixed_html = self.soup_parser(rendered_output)["fixed_html"]
 
         # Tell WeasyPrint where to resolve relative paths from (very important!)
-        HTML(string=fixed_html, base_url=data_dict["image_path"]).write_pdf(
-            target=str(output_file), stylesheets=[CSS(filename=str(self.css_file))]
+        return self._export(
+            fixed_html, output_file, cache_key, base_url=data_dict["image_path"]
+        )
+
+    def generate_roster(self, characters, title="Character Roster"):
+        """
+        Render the sheets of characters (dicts as stored) into one PDF,
+        outputs/roster.pdf, in a single WeasyPrint layout pass. The sheets
+        are built and the portraits resized in the render worker.
+        """
+        self.logger.info(f"Starting roster generation ({len(characters)} characters)")
+        return self.render_service.render_roster(
+            characters,
+            self.outputs_dir / "roster.pdf",
+            title=title,
+            css_files=[self.css_file],
+        )
+
+    def _export(
+        self, fixed_html, output_file, cache_key, extra_styles=None, base_url=None
+    ):
+        """
+        Preview according to preview_mode and write the PDF to output_file.
+        Always returns a RenderJob; a rejected preview gives a cancelled one.
+        """
+        render_args = dict(
+            css_files=[self.css_file], extra_styles=extra_styles, base_url=base_url
         )
 
-        # print(f"PDF generated at {output_file}")
+        if self.preview_mode == "raster":
+            return self.preview_rendered(
+                fixed_html, output_file, cache_key, **render_args
+            )
+
+        if self.preview_mode == "html" and not self.preview_html(fixed_html):
+            self.logger.info("user rejected preview")
+            return self.render_service.cancelled_job(output_file)
+
+        # generate PDF in the background
+        job = self.render_service.render_pdf(fixed_html, output_file, **render_args)
+        job.finished.connect(lambda path: self.pdf_cache.put(cache_key, path))
+        return job
+
+    def preview_rendered(self, fixed_html, output_file, cache_key, **render_args):
+        """
+        Render to a preview file, show its pages and, if accepted, move that
+        same file to output_file (no second render). Returns a finished
+        RenderJob for output_file, or a cancelled one when rejected.
+        """
+        preview_file = output_file.parent / ".preview" / output_file.name
+        job = self.render_service.render_pdf(fixed_html, preview_file, **render_args)
+
+        if self._preview_dialog is None:
+            self._preview_dialog = PDFPreviewDialog()
+        accepted = self._preview_dialog.preview(job, title=output_file.stem)
+
+        if not accepted or not job.done() or job.is_cancelled:
+            job.cancel()
+            preview_file.unlink(missing_ok=True)
+            self.logger.info("user rejected preview")
+            return self.render_service.cancelled_job(output_file)
 
-        return output_file
+        os.replace(preview_file, output_file)
+        self.pdf_cache.put(cache_key, output_file)
+        self.logger.info(f"PDF written to {output_file}")
+        return self.render_service.finished_job(output_file)
 
     def preview_html(self, fixed_html: str):
         """Show preview popup of HTML before generating PDF"""
+        # Chromium is only loaded for this preview mode
+        from PySide6.QtWebEngineWidgets import QWebEngineView
 
         # inject preview-specific css
         preview_css = """
@@ -126,78 +210,3 @@ class PDFGenerator:
 
         result = dlg.exec()
         return result == QDialog.Accepted
-
-    def soup_parser(self, html_string: str, extra_styles: str | None = None) -> dict:
-        """Process HTML: fix image paths, add classes, and prepare head for CSS."""
-
-        # convert all <img> src paths to file:// URIs
-        soup = BeautifulSoup(html_string, "html.parser")
-        for img in soup.find_all("img"):
-
-            if not img["src"].startswith("file://"):
-                img_path = Path(img["src"]).resolve()
-                img["src"] = img_path.as_uri()
-
-            # ensure a style exists:
-
-            if not img.has_attr("style"):
-                img["style"] = "float: left; margin: 5px;"
-                img["width"] = "179"
-                img["height"] = "230"
-
-            # add class for styling
-            existing_classes = img.get("class", [])
-            if isinstance(existing_classes, str):  # just in case it's a string
-                existing_classes = existing_classes.split()
-            if "pdf-img" not in existing_classes:
-                existing_classes.append("pdf-img")
-            if "float" not in existing_classes:
-                float_dir = img.get("style", "").split(":")[1].strip()
-                if float_dir == "right;":
-                    existing_classes.append("float-right")
-                elif float_dir == "left;":
-                    existing_classes.append("float-left")
-            img["class"] = existing_classes
-
-        # prep head
-        head = soup.head or soup.new_tag("head")
-
-        # link to css
-        link_main = soup.new_tag(
-            "link", rel="stylesheet", href=self.css_file.resolve().as_uri()
-        )
-        head.append(link_main)
-
-        # inject extra styles
-        if extra_styles:
-            style_tag = soup.new_tag("style")
-            style_tag.string = extra_styles
-            head.append(style_tag)
-
-        # ensure head is in soup
-        if not soup.head:
-            soup.html.insert(0, head)
-
-        # convert back to string:
-        return {"fixed_html": str(soup), "head": head}
-
-    def generate_html(self, data_dict, extra_styles=None):
-
-        # Make sure image path is absolute
-        if "image_path" in data_dict:
-            data_dict["image_path"] = Path(data_dict["image_path"]).resolve().as_uri()
-
-        # break cyberware list into rows of 4
-        if "cyberware" in data_dict:
-            cyberware_list = data_dict["cyberware"]
-            rows = []
-            for i in range(0, len(cyberware_list), 4):
-                rows.append(cyberware_list[i : i + 4])
-            data_dict["cyberware"] = rows
-
-        rendered_output = self.template.render(data_dict)
-
-        # process html via soup_parser
-        fixed_html_dict = self.soup_parser(rendered_output, extra_styles=extra_styles)
-        fixed_html = fixed_html_dict["fixed_html"]
-        return fixed_html
@@ -0,0 +1,201 @@
+import fitz
+from PySide6.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QHBoxLayout,
+    QPushButton,
+    QLabel,
+    QScrollArea,
+    QWidget,
+    QProgressBar,
+)
+from PySide6.QtGui import QImage, QPixmap
+from PySide6.QtCore import Qt, QTimer
+
+
+class PDFPreviewDialog(QDialog):
+    """
+    Preview of the real WeasyPrint output, shown as page rasters.
+
+    One dialog is kept and reused for every export. While the PDF renders in
+    the RenderService the dialog shows progress; once it exists, pages get
+    placeholders of the right size and PyMuPDF rasterizes them one per timer
+    tick, visible pages first and then their neighbours, so scrolling stays
+    responsive. Pages far from the viewport drop their pixmaps again.
+    """
+
+    def __init__(self, parent=None, max_zoom=1.5, keep_pages=24):
+        super().__init__(parent)
+        self.setWindowTitle("Preview")
+        self.resize(1000, 800)
+
+        self.max_zoom = max_zoom
+        self.keep_pages = keep_pages
+
+        self._doc = None
+        self._zoom = 1.0
+        self._labels = []
+        self._rendered = set()
+        self._job = None
+
+        layout = QVBoxLayout(self)
+
+        self.status = QLabel("")
+        layout.addWidget(self.status)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        layout.addWidget(self.progress_bar)
+
+        self.scroll = QScrollArea()
+        self.scroll.setWidgetResizable(True)
+        self.scroll.setAlignment(Qt.AlignHCenter)
+        self.pages = QWidget()
+        self.pages_layout = QVBoxLayout(self.pages)
+        self.pages_layout.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
+        self.scroll.setWidget(self.pages)
+        self.scroll.verticalScrollBar().valueChanged.connect(self._schedule)
+        layout.addWidget(self.scroll)
+
+        # buttons
+        btn_row = QHBoxLayout()
+        self.accept_btn = QPushButton("Accept", self)
+        self.reject_btn = QPushButton("Reject", self)
+        btn_row.addWidget(self.accept_btn)
+        btn_row.addWidget(self.reject_btn)
+        self.accept_btn.clicked.connect(lambda: self.done(QDialog.Accepted))
+        self.reject_btn.clicked.connect(lambda: self.done(QDialog.Rejected))
+        layout.addLayout(btn_row)
+
+        self._render_timer = QTimer(self)
+        self._render_timer.setSingleShot(True)
+        self._render_timer.setInterval(0)
+        self._render_timer.timeout.connect(self._render_next)
+
+    # api
+
+    def preview(self, job, title="Preview"):
+        """Show job's PDF once it is rendered; True if the user accepted it."""
+        self._reset()
+        self._job = job
+        self.setWindowTitle(f"Preview - {title}")
+        self.status.setText("Rendering…")
+        self.progress_bar.setValue(0)
+        self.progress_bar.show()
+        self.accept_btn.setEnabled(False)
+
+        job.progress.connect(self._on_progress)
+        job.finished.connect(self._on_rendered)
+        job.failed.connect(self._on_failed)
+        try:
+            result = self.exec()
+        finally:
+            for signal, slot in (
+                (job.progress, self._on_progress),
+                (job.finished, self._on_rendered),
+                (job.failed, self._on_failed),
+            ):
+                try:
+                    signal.disconnect(slot)
+                except (RuntimeError, TypeError):
+                    pass
+            self._job = None
+            self._reset()  # release the file and the pixmaps while hidden
+        return result == QDialog.Accepted
+
+    # job signals
+
+    def _on_progress(self, percent, message):
+        self.progress_bar.setValue(percent)
+        self.status.setText(message)
+
+    def _on_failed(self, error):
+        self.progress_bar.hide()
+        self.status.setText(f"Render failed: {error}")
+
+    def _on_rendered(self, path):
+        self.progress_bar.hide()
+        self._doc = fitz.open(path)
+        self.status.setText(f"{self._doc.page_count} pages")
+
+        available = self.scroll.viewport().width() - 40
+        widest = max((page.rect.width for page in self._doc), default=1)
+        self._zoom = max(0.2, min(self.max_zoom, available / widest))
+
+        for page in self._doc:
+            label = QLabel()
+            label.setAlignment(Qt.AlignCenter)
+            label.setStyleSheet("background: white; border: 1px solid #999;")
+            label.setFixedSize(
+                int(page.rect.width * self._zoom), int(page.rect.height * self._zoom)
+            )
+            self.pages_layout.addWidget(label)
+            self._labels.append(label)
+
+        self.accept_btn.setEnabled(True)
+        self._schedule()
+
+    # lazy page rendering
+
+    def _schedule(self, *args):
+        if self._doc is not None:
+            self._render_timer.start()
+
+    def _visible_range(self):
+        top = self.scroll.verticalScrollBar().value()
+        bottom = top + self.scroll.viewport().height()
+        first = last = None
+        for i, label in enumerate(self._labels):
+            y = label.y()
+            if y + label.height() >= top and y <= bottom:
+                first = i if first is None else first
+                last = i
+            elif first is not None:
+                break
+        if first is None:
+            return 0, 0
+        return first, last
+
+    def _render_next(self):
+        if self._doc is None:
+            return
+        first, last = self._visible_range()
+
+        # visible pages first, then a couple of pages either side
+        span = last - first + 1
+        order = list(range(first, last + 1))
+        for distance in range(1, span + 2):
+            order += [first - distance, last + distance]
+
+        for i in order:
+            if 0 <= i < len(self._labels) and i not in self._rendered:
+                self._render_page(i)
+                self._render_timer.start()  # next page on the next tick
+                break
+
+        # keep memory bounded on long documents
+        for i in list(self._rendered):
+            if abs(i - first) > self.keep_pages and abs(i - last) > self.keep_pages:
+                self._labels[i].clear()
+                self._rendered.discard(i)
+
+    def _render_page(self, i):
+        pix = self._doc[i].get_pixmap(
+            matrix=fitz.Matrix(self._zoom, self._zoom), alpha=False
+        )
+        image = QImage(
+            pix.samples, pix.width, pix.height, pix.stride, QImage.Format_RGB888
+        ).copy()  # QImage does not own pix.samples
+        self._labels[i].setPixmap(QPixmap.fromImage(image))
+        self._rendered.add(i)
+
+    def _reset(self):
+        self._render_timer.stop()
+        for label in self._labels:
+            self.pages_layout.removeWidget(label)
+            label.deleteLater()
+        self._labels = []
+        self._rendered = set()
+        if self._doc is not None:
+            self._doc.close()
+            self._doc = None
+        self.scroll.verticalScrollBar().setValue(0)
@@ -0,0 +1,173 @@
+import os
+from pathlib import Path
+import brotli
+from jinja2 import Environment, FileSystemLoader
+
+from .pdf_cache import PDFCache
+from .html_normalizer import normalize_html, normalize_images, local_image_path
+from .image_assets import ImageAssetCache
+from .sheet_cache import SheetCache
+
+
+# the files template.html renders from
+SHEET_TEMPLATES = ("template.html", "_sheet.html")
+
+
+class PDFRenderer:
+    """
+    The Qt-free half of the PDF exporter: template, stylesheet, HTML
+    normalization and the image/PDF caches. PDFGenerator adds the previews
+    and the background render service on top; export_cli uses this directly.
+    """
+
+    # extra styles for writer documents (single exports and compiled books)
+    DOCUMENT_STYLES = """
+            h1 {
+                text-align:center; 
+                }
+            h2 {
+                text-align: left;
+                margin-left: 0.5rem;
+            }
+            h3 {
+                text-align: left;
+                margin-left: 0.5rem;
+            }
+        """
+
+    def __init__(self, logger):
+        self.base_dir = Path(__file__).resolve().parent  # folder containing this file
+        env = Environment(loader=FileSystemLoader(self.base_dir / "templates"))
+        self.template = env.get_template("template.html")
+        self.roster_template = env.get_template("roster.html")
+        self.sheet_macro = env.get_template("_sheet.html").module.sheet
+        self.css_file = self.base_dir / "style.css"
+        self.outputs_dir = self.base_dir.parent / "outputs"
+        self.logger = logger
+
+        # print-sized copies of the images exports reference
+        self.image_assets = ImageAssetCache(
+            self.outputs_dir / ".image_cache", logger=logger
+        )
+
+        # unchanged exports are copied from here instead of re-rendered
+        self.pdf_cache = PDFCache(self.outputs_dir / ".pdf_cache", logger=logger)
+
+        # rendered sheets of unchanged characters
+        self.sheet_cache = SheetCache(
+            [self.base_dir / "templates" / name for name in SHEET_TEMPLATES],
+            self.css_file,
+        )
+
+    def read_html_file(self, html_path):
+        """Read a body from data/html (plain or brotli-compressed)."""
+        html_file = self.base_dir.parent / "data" / "html" / html_path
+        if html_file.suffix == ".br":
+            return brotli.decompress(html_file.read_bytes()).decode("utf-8")
+        with open(html_file, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def soup_parser(
+        self,
+        html_string: str,
+        extra_styles: str | None = None,
+        optimize_images: bool = True,
+    ) -> dict:
+        """Process HTML: fix image paths, add classes, and prepare head for CSS."""
+        return normalize_html(
+            html_string,
+            self.css_file.resolve().as_uri(),
+            extra_styles=extra_styles,
+            image_assets=self.image_assets if optimize_images else None,
+        )
+
+    def generate_html(self, data_dict, extra_styles=None):
+        sheet_key = self.sheet_cache.key(data_dict)
+        cached = self.sheet_cache.get(sheet_key, ("html", extra_styles))
+        if cached is not None:
+            return cached
+
+        rendered_output = self.render_template(data_dict)
+
+        # process html via soup_parser; this html is stored, so it keeps the
+        # original images rather than the export cache copies
+        fixed_html_dict = self.soup_parser(
+            rendered_output, extra_styles=extra_styles, optimize_images=False
+        )
+        fixed_html = fixed_html_dict["fixed_html"]
+        self.sheet_cache.put(sheet_key, ("html", extra_styles), fixed_html)
+        return fixed_html
+
+    def render_template(self, data_dict):
+        """Fill the character sheet template (before soup_parser)."""
+        return self.template.render(character=self.prepare_character(data_dict))
+
+    def prepare_character(self, data_dict):
+        """Adjust a character dict for the sheet template (in place) and return it."""
+
+        # Make sure a local image path is absolute (data: and web URLs stay)
+        if "image_path" in data_dict:
+            path = local_image_path(data_dict["image_path"])
+            if path is not None:
+                data_dict["image_path"] = path.as_uri()
+
+        # break cyberware list into rows of 4
+        if "cyberware" in data_dict:
+            cyberware_list = data_dict["cyberware"]
+            rows = []
+            for i in range(0, len(cyberware_list), 4):
+                rows.append(cyberware_list[i : i + 4])
+            data_dict["cyberware"] = rows
+
+        return data_dict
+
+    def write_roster_html(self, characters, html_file, title="Character Roster"):
+        """
+        Write one HTML document holding the sheets of all characters (dicts
+        as stored) to html_file, ready for a single WeasyPrint layout.
+
+        An index page comes first; sheets follow in the same handle/name
+        order, one per page. Each sheet gets the image fixes soup_parser
+        gives a single sheet (print-sized portraits, pdf-img/float classes),
+        and the template output is streamed to the file sheet by sheet
+        instead of being built up as one string. Runs in a render worker.
+        """
+        characters = sorted(characters, key=roster_sort_key)
+        index = [
+            {
+                "anchor": f"char-{i}",
+                "handle": c.get("handle") or c.get("name", ""),
+                "name": c.get("name", "") if c.get("handle") else "",
+            }
+            for i, c in enumerate(characters)
+        ]
+        sheets = (
+            (entry["anchor"], c.get("last_updated", ""), self._roster_sheet(c))
+            for entry, c in zip(index, characters)
+        )
+
+        html_file = Path(html_file)
+        html_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = html_file.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(
+                self.roster_template.generate(title=title, index=index, sheets=sheets)
+            )
+        os.replace(tmp, html_file)
+        self.logger.info(f"Roster of {len(characters)} characters: {html_file}")
+        return html_file
+
+    def _roster_sheet(self, character):
+        data = {k: v for k, v in character.items() if k not in ("_id", "image_path")}
+        image_path = str(character.get("image_path") or "").strip('"')
+        if image_path:
+            data["image_path"] = image_path
+        return normalize_images(
+            self.sheet_macro(self.prepare_character(data)),
+            image_assets=self.image_assets,
+        )
+
+
+def roster_sort_key(character):
+    handle = character.get("handle") or character.get("name") or ""
+    return (handle.casefold(), (character.get("name") or "").casefold())
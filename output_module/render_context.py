@@ -0,0 +1,88 @@
+import hashlib
+import threading
+from pathlib import Path
+
+from weasyprint import HTML, CSS
+from weasyprint.text.fonts import FontConfiguration
+
+
+class RenderContext:
+    """
+    Warm WeasyPrint state shared by every render in a process.
+
+    Holds one FontConfiguration, so fonts are discovered once rather than per
+    render, and the parsed stylesheets, keyed by a hash of their content so
+    an edited style.css is re-parsed while an unchanged one is reused.
+    """
+
+    MAX_STYLESHEETS = 64
+
+    def __init__(self):
+        self.font_config = FontConfiguration()
+        self._stylesheets = {}  # content hash -> CSS
+        self._lock = threading.Lock()
+
+    def stylesheet(self, filename=None, string=None):
+        """Return the parsed CSS for a file or a string, parsing it only once."""
+        if filename is not None:
+            path = Path(filename)
+            data = path.read_bytes()
+            base_url = str(path.resolve())
+        else:
+            data = string.encode("utf-8")
+            base_url = None
+
+        key = hashlib.sha1(data + (base_url or "").encode("utf-8")).hexdigest()
+        with self._lock:
+            css = self._stylesheets.get(key)
+            if css is None:
+                if len(self._stylesheets) >= self.MAX_STYLESHEETS:
+                    self._stylesheets.clear()  # old edits of the same sheets
+                css = CSS(
+                    string=data.decode("utf-8"),
+                    base_url=base_url,
+                    font_config=self.font_config,
+                )
+                self._stylesheets[key] = css
+        return css
+
+    def stylesheets(self, css_files=(), extra_styles=None):
+        sheets = [self.stylesheet(filename=css_file) for css_file in css_files]
+        if extra_styles:
+            sheets.append(self.stylesheet(string=extra_styles))  # overrides last
+        return sheets
+
+    def render(
+        self,
+        html_string=None,
+        css_files=(),
+        extra_styles=None,
+        base_url=None,
+        filename=None,
+    ):
+        """Lay out html_string (or the HTML file filename) and return the Document."""
+        if filename is not None:
+            html = HTML(filename=str(filename), base_url=base_url)
+        else:
+            html = HTML(string=html_string, base_url=base_url)
+        return html.render(
+            stylesheets=self.stylesheets(css_files, extra_styles),
+            font_config=self.font_config,
+        )
+
+    def clear(self):
+        with self._lock:
+            self._stylesheets.clear()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_context():
+    """The process wide RenderContext (created on first use)."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = RenderContext()
+        return _shared
@@ -0,0 +1,303 @@
+import os
+import queue
+import itertools
+import tempfile
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from . import render_worker
+
+
+class RenderJob(QObject):
+    """Handle for one queued render; signals fire on the GUI thread."""
+
+    progress = Signal(int, str)  # percent, message
+    finished = Signal(str)  # output path (or str(result) when there is no output file)
+    failed = Signal(str)  # error message
+    cancelled = Signal()
+
+    def __init__(self, job_id, label, output_file=None, temp_file=None, parent=None):
+        super().__init__(parent)
+        self.job_id = job_id
+        self.label = label
+        self.output_file = output_file
+        self.temp_file = temp_file
+        self.future = None
+        self.result = None
+        self.is_cancelled = False
+
+    def cancel(self):
+        self.parent().cancel(self)
+
+    def done(self):
+        return self.future is not None and self.future.done()
+
+
+class RenderService(QObject):
+    """
+    Runs WeasyPrint (and other CPU heavy output tasks) in a process pool.
+
+    submit() returns a RenderJob right away; the GUI stays responsive while
+    jobs queue behind each other in the pool. Workers send progress through
+    a multiprocessing queue which a timer drains on the GUI thread, and
+    completion is relayed from the executor thread through a queued signal,
+    like AutosaveController does for its writes.
+
+    Jobs with an output_file render to a temp file next to it, which is only
+    moved into place when the job succeeds and was not cancelled, so a
+    cancelled or failed export never leaves a half-written PDF behind.
+    """
+
+    job_progress = Signal(object, int, str)  # job, percent, message
+    job_finished = Signal(object)  # job
+    job_failed = Signal(object, str)  # job, error
+    job_cancelled = Signal(object)  # job
+
+    _job_done = Signal(object)  # future, emitted from the executor thread
+
+    def __init__(self, logger, max_workers=None, css_files=(), parent=None):
+        """
+        :param css_files: stylesheets every worker parses once at startup
+        """
+        super().__init__(parent)
+        self.logger = logger
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) // 2)
+        self.css_files = [str(f) for f in css_files]
+
+        self._executor = None
+        self._progress_queue = None
+        self._ids = itertools.count(1)
+        self.jobs = {}  # job_id -> RenderJob, while queued or running
+        self._abandoned = {}  # cancelled while running; temp files dropped on completion
+
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(100)
+        self._poll_timer.timeout.connect(self._drain_progress)
+
+        self._job_done.connect(self._on_job_done)
+
+    # submitting
+
+    def submit(self, fn, *args, label="", output_file=None, **kwargs):
+        """
+        Queue fn(*args, **kwargs) in a worker process and return its RenderJob.
+
+        fn must be a picklable module-level function. When output_file is
+        given, fn also receives target=<temp file> and must write its output
+        there; the temp file replaces output_file once the job succeeds.
+        """
+        job_id = next(self._ids)
+        temp_file = None
+        if output_file is not None:
+            output_file = Path(output_file)
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_file = tempfile.mkstemp(
+                prefix=f".{output_file.stem}.", suffix=".part", dir=output_file.parent
+            )
+            os.close(fd)
+            kwargs["target"] = temp_file
+
+        job = RenderJob(job_id, label or f"job {job_id}", output_file, temp_file, self)
+        self.jobs[job_id] = job
+
+        try:
+            job.future = self._get_executor().submit(
+                render_worker.run_job, job_id, fn, args, kwargs
+            )
+        except BrokenProcessPool:
+            self._executor = None
+            job.future = self._get_executor().submit(
+                render_worker.run_job, job_id, fn, args, kwargs
+            )
+        job.future.job_id = job_id
+        job.future.add_done_callback(self._job_done.emit)
+
+        self._poll_timer.start()
+        self.logger.info(f"Queued render '{job.label}'")
+        return job
+
+    def render_pdf(
+        self, html_string, output_file, css_files=(), extra_styles=None, base_url=None
+    ):
+        """Queue a WeasyPrint render of html_string to output_file."""
+        return self.submit(
+            render_worker.render_pdf,
+            html_string,
+            label=Path(output_file).name,
+            output_file=output_file,
+            css_files=[str(f) for f in css_files],
+            extra_styles=extra_styles,
+            base_url=base_url,
+        )
+
+    def render_pdf_file(self, html_file, output_file, css_files=(), extra_styles=None):
+        """Queue a WeasyPrint render of the HTML file html_file to output_file."""
+        return self.submit(
+            render_worker.render_pdf_file,
+            str(html_file),
+            label=Path(output_file).name,
+            output_file=output_file,
+            css_files=[str(f) for f in css_files],
+            extra_styles=extra_styles,
+        )
+
+    def render_roster(
+        self, characters, output_file, title="Character Roster", css_files=()
+    ):
+        """Queue building the roster of characters and rendering it to output_file."""
+        return self.submit(
+            render_worker.render_roster,
+            list(characters),
+            label=Path(output_file).name,
+            output_file=output_file,
+            title=title,
+            css_files=[str(f) for f in css_files],
+        )
+
+    def finished_job(self, output_file, label=""):
+        """
+        A RenderJob for output_file that is already written (a cache hit or
+        an accepted preview). Its finished signal fires on the next event
+        loop pass, so callers handle it like any other job.
+        """
+        return self._settled_job(output_file, label, cancelled=False)
+
+    def cancelled_job(self, output_file, label=""):
+        """A RenderJob for an export that was called off before rendering."""
+        return self._settled_job(output_file, label, cancelled=True)
+
+    def _settled_job(self, output_file, label, cancelled):
+        job_id = next(self._ids)
+        output_file = Path(output_file)
+        job = RenderJob(job_id, label or output_file.name, output_file, parent=self)
+        job.future = Future()
+        if cancelled:
+            job.is_cancelled = True
+            job.future.cancel()
+        else:
+            job.result = str(output_file)
+            job.future.set_result(job.result)
+        QTimer.singleShot(0, lambda: self._finish(job, cancelled=cancelled))
+        return job
+
+    def cancel(self, job):
+        """Drop a queued job, or discard the result of a running one."""
+        if job.is_cancelled or job.done():
+            return
+        job.is_cancelled = True
+        if not job.future.cancel():
+            # already running: let it finish in the worker, throw away the output
+            self._abandoned[job.job_id] = job
+            self._finish(job, cancelled=True)
+
+    def cancel_all(self):
+        for job in list(self.jobs.values()):
+            self.cancel(job)
+
+    def shutdown(self, wait=True):
+        """Cancel queued jobs and stop the pool; running jobs finish when wait=True."""
+        self._poll_timer.stop()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+        for job in list(self.jobs.values()) + list(self._abandoned.values()):
+            self._discard_temp(job)
+        self.jobs.clear()
+        self._abandoned.clear()
+
+    def _get_executor(self):
+        if self._executor is None:
+            # spawn, not fork: forking a process with Qt and worker threads
+            # running can copy locks that are held and deadlock the child
+            context = multiprocessing.get_context("spawn")
+            self._progress_queue = context.Queue()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=context,
+                initializer=render_worker.init_worker,
+                initargs=(self._progress_queue, self.css_files),
+            )
+        return self._executor
+
+    # results
+
+    def _drain_progress(self):
+        while self._progress_queue is not None:  # None until the pool starts
+            try:
+                job_id, percent, message = self._progress_queue.get_nowait()
+            except (queue.Empty, OSError, ValueError):
+                break
+            job = self.jobs.get(job_id)
+            if job is not None and not job.is_cancelled:
+                job.progress.emit(percent, message)
+                self.job_progress.emit(job, percent, message)
+
+        if not self.jobs:
+            self._poll_timer.stop()
+
+    def _on_job_done(self, future):
+        abandoned = self._abandoned.pop(future.job_id, None)
+        if abandoned is not None:
+            self._discard_temp(abandoned)  # cancelled while running, already reported
+            return
+
+        job = self.jobs.get(future.job_id)
+        if job is None:
+            return
+
+        if future.cancelled() or job.is_cancelled:
+            self._finish(job, cancelled=True)
+            return
+
+        error = future.exception()
+        if error is not None:
+            if isinstance(error, BrokenProcessPool):
+                self._executor = None  # start a fresh pool on the next submit
+            self._finish(job, error=str(error) or type(error).__name__)
+            return
+
+        job.result = future.result()
+        try:
+            if job.output_file is not None:
+                os.replace(job.temp_file, job.output_file)
+                job.temp_file = None
+        except OSError as e:
+            self._finish(job, error=str(e))
+            return
+        self._finish(job)
+
+    def _finish(self, job, cancelled=False, error=None):
+        self._drain_progress()
+        self.jobs.pop(job.job_id, None)
+
+        if cancelled:
+            if job.job_id not in self._abandoned:
+                self._discard_temp(job)
+            self.logger.info(f"Render '{job.label}' cancelled")
+            job.cancelled.emit()
+            self.job_cancelled.emit(job)
+        elif error is not None:
+            self._discard_temp(job)
+            self.logger.error(f"Render '{job.label}' failed: {error}")
+            job.failed.emit(error)
+            self.job_failed.emit(job, error)
+        else:
+            output = str(job.output_file) if job.output_file else str(job.result)
+            self.logger.info(f"Render '{job.label}' finished: {output}")
+            job.finished.emit(output)
+            self.job_finished.emit(job)
+
+        if not self.jobs:
+            self._poll_timer.stop()
+
+    def _discard_temp(self, job):
+        if job.temp_file and os.path.exists(job.temp_file):
+            try:
+                os.remove(job.temp_file)
+            except OSError:
+                pass
+        job.temp_file = None
@@ -0,0 +1,180 @@
+"""
+Code that runs inside RenderService worker processes.
+
+Kept free of Qt imports so a worker process only loads WeasyPrint and
+PyMuPDF. Tasks report progress through report_progress(), which forwards to
+the queue the pool was initialized with, tagged with the id of the job
+being run.
+"""
+
+import math
+import logging
+from pathlib import Path
+
+import fitz
+
+from .render_context import shared_context
+
+_progress_queue = None
+_current_job = None
+_renderer = None  # PDFRenderer for roster tasks, created on first use
+
+
+def init_worker(progress_queue, css_files=()):
+    """ProcessPoolExecutor initializer; pre-parses css_files in the new worker."""
+    global _progress_queue
+    _progress_queue = progress_queue
+    context = shared_context()
+    for css_file in css_files:
+        try:
+            context.stylesheet(filename=css_file)
+        except OSError:
+            pass  # reported by the first render that needs it
+
+
+def report_progress(percent, message=""):
+    """Send (job_id, percent, message) back to the GUI process (no-op outside a job)."""
+    if _progress_queue is not None and _current_job is not None:
+        _progress_queue.put((_current_job, int(percent), message))
+
+
+def run_job(job_id, fn, args, kwargs):
+    """Run fn for job_id so report_progress knows which job it belongs to."""
+    global _current_job
+    _current_job = job_id
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _current_job = None
+
+
+# tasks
+
+
+def render_pdf(html_string, target, css_files=(), extra_styles=None, base_url=None):
+    """Render html_string to a PDF file at target and return target."""
+    report_progress(5, "Laying out pages")
+    document = shared_context().render(
+        html_string, css_files=css_files, extra_styles=extra_styles, base_url=base_url
+    )
+
+    report_progress(70, f"Writing {len(document.pages)} pages")
+    document.write_pdf(target=str(target))
+
+    report_progress(100, "Done")
+    return str(target)
+
+
+def render_pdf_file(html_file, target, css_files=(), extra_styles=None):
+    """Like render_pdf, but WeasyPrint reads the HTML from html_file."""
+    report_progress(5, "Laying out pages")
+    document = shared_context().render(
+        css_files=css_files, extra_styles=extra_styles, filename=html_file
+    )
+
+    report_progress(70, f"Writing {len(document.pages)} pages")
+    document.write_pdf(target=str(target))
+
+    report_progress(100, "Done")
+    return str(target)
+
+
+def render_roster(characters, target, title="Character Roster", css_files=()):
+    """
+    Write the roster HTML of characters (dicts as stored) next to target,
+    with print-sized portraits, and render it to a PDF at target.
+    """
+    global _renderer
+    if _renderer is None:
+        from .pdf_renderer import PDFRenderer
+
+        _renderer = PDFRenderer(logging.getLogger(__name__))
+
+    report_progress(1, f"Writing {len(characters)} sheets")
+    html_file = Path(target).with_suffix(".html")
+    _renderer.write_roster_html(characters, html_file, title=title)
+    try:
+        return render_pdf_file(html_file, target, css_files=css_files)
+    finally:
+        html_file.unlink(missing_ok=True)
+
+
+def stitch_pdfs(part_files, titles, target, book_title="Book"):
+    """
+    Join per-document PDFs into one book at target.
+
+    Adds table of contents pages (with links) in front, a bookmark per
+    document and a page number at the bottom of every content page.
+    """
+    margin, line_height, font_size = 56, 18, 11
+
+    book = fitz.open()
+    starts = []  # first content page of each part (0-based, before the contents)
+    for i, part_file in enumerate(part_files):
+        with fitz.open(part_file) as part:
+            starts.append(book.page_count)
+            book.insert_pdf(part)
+        report_progress(80 * (i + 1) // len(part_files), f"Added {titles[i]}")
+
+    if book.page_count == 0:
+        raise ValueError("Nothing to compile")
+
+    # page numbers
+    for number, page in enumerate(book, start=1):
+        label = str(number)
+        width = fitz.get_text_length(label, fontsize=9)
+        page.insert_text(
+            ((page.rect.width - width) / 2, page.rect.height - 14), label, fontsize=9
+        )
+
+    # table of contents, laid out on pages the size of the first content page
+    rect = book[0].rect
+    per_page = max(1, int((rect.height - 2 * margin - 40) // line_height))
+    toc_pages = math.ceil(len(titles) / per_page)
+    for n in range(toc_pages):
+        book.new_page(pno=n, width=rect.width, height=rect.height)
+
+    report_progress(90, "Writing contents")
+    max_title = rect.width - 2 * margin - 50
+    for n in range(toc_pages):
+        page = book[n]
+        y = margin
+        if n == 0:
+            page.insert_text((margin, y + 16), book_title, fontsize=20)
+            y += 40
+        for i in range(n * per_page, min(len(titles), (n + 1) * per_page)):
+            title = titles[i] or "(untitled)"
+            while (
+                len(title) > 1
+                and fitz.get_text_length(title, fontsize=font_size) > max_title
+            ):
+                title = title[:-4] + "..."
+            page_label = str(starts[i] + 1)
+            y += line_height
+            page.insert_text((margin, y), title, fontsize=font_size)
+            label_width = fitz.get_text_length(page_label, fontsize=font_size)
+            page.insert_text(
+                (rect.width - margin - label_width, y), page_label, fontsize=font_size
+            )
+            page.insert_link(
+                {
+                    "kind": fitz.LINK_GOTO,
+                    "from": fitz.Rect(margin, y - font_size, rect.width - margin, y + 4),
+                    "page": toc_pages + starts[i],
+                }
+            )
+
+    # bookmarks (1-based physical pages)
+    book.set_toc(
+        [[1, "Contents", 1]]
+        + [
+            [1, title or "(untitled)", toc_pages + start + 1]
+            for title, start in zip(titles, starts)
+        ]
+    )
+
+    book.save(str(target), garbage=3, deflate=True)
+    book.close()
+
+    report_progress(100, "Done")
+    return str(target)
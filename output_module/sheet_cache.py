@@ -0,0 +1,84 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+class SheetCache:
+    """
+    Memo of rendered character sheets, so an unchanged character is not run
+    through Jinja and soup_parser again.
+
+    Entries are keyed by the character's _id and last_updated, the hashes of
+    the template files and the stylesheet, and the size/mtime of its portrait;
+    editing any of those gives a new key. File hashes are only recomputed
+    when a file's size or mtime changes. Character saves call invalidate() to
+    drop the entries of the old version straight away; the least recently
+    used entries go once there are more than max_entries.
+    """
+
+    def __init__(self, template_files, css_file, max_entries=256):
+        self.template_files = [Path(f) for f in template_files]
+        self.css_file = Path(css_file)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (key, kind) -> value
+        self._file_hashes = {}  # path -> ((size, mtime_ns), hash)
+        self._lock = threading.Lock()
+
+    def key(self, data_dict):
+        """Key for a character dict as stored (before render_template)."""
+        image_path = str(data_dict.get("image_path") or "").strip('"')
+        try:
+            stat = os.stat(image_path) if image_path else None
+            image = (image_path, stat.st_size, stat.st_mtime_ns) if stat else None
+        except OSError:
+            image = (image_path, None, None)
+
+        with self._lock:
+            template_hash = "".join(self._file_hash(f) for f in self.template_files)
+            css_hash = self._file_hash(self.css_file)
+        return (
+            str(data_dict.get("_id")),
+            data_dict.get("last_updated"),
+            template_hash,
+            css_hash,
+            image,
+        )
+
+    def get(self, key, kind):
+        with self._lock:
+            value = self._entries.get((key, kind))
+            if value is not None:
+                self._entries.move_to_end((key, kind))
+            return value
+
+    def put(self, key, kind, value):
+        with self._lock:
+            self._entries[(key, kind)] = value
+            self._entries.move_to_end((key, kind))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, char_id):
+        """Drop every entry of the character with this _id."""
+        char_id = str(char_id)
+        with self._lock:
+            for entry in [e for e in self._entries if e[0][0] == char_id]:
+                del self._entries[entry]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _file_hash(self, path):
+        try:
+            stat = path.stat()
+        except OSError:
+            return "missing"
+        version = (stat.st_size, stat.st_mtime_ns)
+        cached = self._file_hashes.get(path)
+        if cached is None or cached[0] != version:
+            digest = hashlib.sha1(path.read_bytes()).hexdigest()
+            cached = self._file_hashes[path] = (version, digest)
+        return cached[1]
@@ -0,0 +1,145 @@
+import re
+import sqlite3
+import time
+
+import pytest
+
+from character_module.SQLiteCollection import QueryCompiler, SQLiteCollectionWrapper
+
+
+# query compiler
+
+
+def compile_query(query, columns=("name", "age", "role")):
+    return QueryCompiler(set(columns)).compile(query)
+
+
+def test_equality_and_comparisons():
+    query = {"name": "Vex", "age": {"$gte": 20, "$lt": 30}}
+    sql, params, fields = compile_query(query)
+    assert sql == '"name" = ? AND "age" >= ? AND "age" < ?'
+    assert params == ["Vex", 20, 30]
+    assert fields == ["name", "age", "age"]
+
+
+def test_none_and_missing_fields():
+    assert compile_query({"name": None})[0] == '"name" IS NULL'
+    assert compile_query({"name": {"$ne": None}})[0] == '"name" IS NOT NULL'
+    # a field that is not a column only equals None
+    assert compile_query({"cost": None})[0] == "1"
+    assert compile_query({"cost": 5})[0] == "0"
+    assert compile_query({"cost": {"$ne": 5}})[0] == "1"
+
+
+def test_membership():
+    sql, params, _ = compile_query({"role": {"$in": ["Netrunner", "Fixer"]}})
+    assert sql == '"role" IN (?, ?)'
+    assert params == ["Netrunner", "Fixer"]
+    assert compile_query({"role": {"$in": []}})[0] == "0"
+    assert compile_query({"role": {"$nin": []}})[0] == "1"
+
+
+def test_regex_prefix_becomes_range():
+    sql, params, _ = compile_query({"name": {"$regex": "^Va"}})
+    assert sql == '("name" >= ? AND "name" < ?)'
+    assert params == ["Va", "Vb"]
+
+    # a case-insensitive prefix cannot use the range
+    sql, params, _ = compile_query({"name": {"$regex": re.compile("^va", re.I)}})
+    assert sql == 'REGEXP_I(?, "name")'
+    assert params == ["^va"]
+
+    sql, params, _ = compile_query({"name": {"$regex": "ex$", "$options": "i"}})
+    assert sql == 'REGEXP_I(?, "name")'
+    assert params == ["ex$"]
+
+
+def test_and_or():
+    sql, params, _ = compile_query({"$or": [{"name": "A"}, {"age": {"$gt": 3}}]})
+    assert sql == '("name" = ? OR "age" > ?)'
+    assert params == ["A", 3]
+
+
+def test_unsupported_operator():
+    with pytest.raises(ValueError):
+        compile_query({"age": {"$mod": [2, 0]}})
+    with pytest.raises(ValueError):
+        compile_query({"$nor": []})
+
+
+# auto indexes
+
+
+def make_items(path, count=200):
+    conn = sqlite3.connect(path)
+    items = SQLiteCollectionWrapper(conn, "items")
+    items.insert_many([{"name": f"item {i}", "cost": i % 10} for i in range(count)])
+    conn.close()
+
+
+def wait_for_builder(collection):
+    for _ in range(100):
+        if collection._index_builder is None:
+            return
+        time.sleep(0.01)
+
+
+def test_auto_index_built_in_background(tmp_path):
+    path = tmp_path / "items.db"
+    make_items(path)
+    items = SQLiteCollectionWrapper(sqlite3.connect(path), "items")
+
+    for _ in range(SQLiteCollectionWrapper.AUTO_INDEX_AFTER):
+        assert items.find_one({"cost": 5})["cost"] == 5
+    wait_for_builder(items)
+
+    assert "cost" in items.indexed_fields()
+    assert not items.failed_auto_indexes
+    assert items.count_documents({"cost": 5}) == 20
+
+
+def test_auto_index_skipped_on_read_only_connection(tmp_path):
+    path = tmp_path / "items.db"
+    make_items(path)
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    items = SQLiteCollectionWrapper(conn, "items")
+
+    for _ in range(2 * SQLiteCollectionWrapper.AUTO_INDEX_AFTER):
+        assert items.find_one({"cost": 5})["cost"] == 5
+
+    assert items.failed_auto_indexes == {"cost"}
+    assert "cost" not in items.indexed_fields()
+
+
+def test_auto_index_in_memory_waits_for_a_write():
+    items = SQLiteCollectionWrapper(sqlite3.connect(":memory:"), "items")
+    items.insert_one({"cost": 1})
+
+    for _ in range(SQLiteCollectionWrapper.AUTO_INDEX_AFTER):
+        items.count_documents({"cost": 1})
+    assert "cost" not in items.indexed_fields()
+
+    items.insert_one({"cost": 2})
+    assert "cost" in items.indexed_fields()
+
+
+# writes
+
+
+def test_none_does_not_create_an_untyped_column():
+    items = SQLiteCollectionWrapper(sqlite3.connect(":memory:"), "items")
+    items.insert_one({"_id": "a", "img": None})
+    assert "img" not in items.columns
+
+    items.insert_one({"_id": "b", "img": {"x": 1}})
+    assert items.find_one({"_id": "b"}) == {"_id": "b", "img": {"x": 1}}
+    assert items.find_one({"_id": "a"}) == {"_id": "a"}
+
+
+def test_lists_only_go_into_json_columns():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE items (name TEXT, tags)")
+    items = SQLiteCollectionWrapper(conn, "items")
+    with pytest.raises(TypeError):
+        items.insert_one({"name": "knife", "tags": ["melee"]})
+    assert items.count_documents({}) == 0
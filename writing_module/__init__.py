@@ -1,13 +1,23 @@
-from .writing_window import WritingModule
-from .writing_store import WritingStore
-from .indented_textEditor import IndentedTextEdit
-from .writing_module_layout import WritingLayout
-from .row_editor import RowBasedHtmlEditor
-
-__all__ = [
-    "WritingModule",
-    "WritingStore",
-    "IndentedTextEdit",
-    "WritingLayout",
-    "RowBasedHtmlEditor",
-]
+# names are imported on first access so the Qt-free parts (stores, search,
+# bulk import) can be used headless without pulling in PySide6
+import importlib
+
+_EXPORTS = {
+    "WritingModule": ".writing_window",
+    "WritingStore": ".writing_store",
+    "SQLiteWritingStore": ".sqlite_writing_store",
+    "IndentedTextEdit": ".indented_textEditor",
+    "WritingLayout": ".writing_module_layout",
+    "RowBasedHtmlEditor": ".row_editor",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
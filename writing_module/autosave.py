@@ -0,0 +1,149 @@
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+
+class AutosaveController(QObject):
+    """
+    Debounced save pipeline for the writer.
+
+    Edits restart a single-shot timer, so a burst of typing becomes one save.
+    When the timer fires the document is serialized once on the GUI thread
+    (QTextDocument is not thread-safe) and the disk write is handed to a
+    single worker thread, which keeps writes ordered. A save requested while
+    a write is running is snapshotted right away and queued behind it; a
+    newer snapshot of the same document replaces one that has not started.
+    """
+
+    state_changed = Signal(str)  # "dirty", "saving", "saved" or "error"
+    saved = Signal(str)  # doc_id whose write finished
+
+    _write_done = Signal(object)  # future, emitted from the worker thread
+
+    def __init__(self, editor, snapshot, store, logger, delay_ms=1500):
+        """
+        :param snapshot: callable returning the save_document kwargs
+            (doc_id, html_content, title, font, font_size)
+        """
+        super().__init__(editor)
+
+        self.store = store
+        self.logger = logger
+        self.snapshot = snapshot
+
+        self._dirty = False
+        self._paused = 0
+        self._future = None  # the most recently submitted write
+        self._futures = {}  # doc_id -> its latest submitted write
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self.flush)
+
+        self._write_done.connect(self._on_write_done)
+        editor.document().contentsChanged.connect(self.mark_dirty)
+
+    # state
+
+    @property
+    def dirty(self):
+        return self._dirty
+
+    def mark_dirty(self):
+        if self._paused:
+            return
+        self._dirty = True
+        self.state_changed.emit("dirty")
+        self._timer.start()  # restarts the debounce window
+
+    @contextmanager
+    def paused(self):
+        """Ignore content changes made by the app itself (loading, clearing)."""
+        self._paused += 1
+        try:
+            yield
+        finally:
+            self._paused -= 1
+
+    def mark_clean(self):
+        """The editor matches what is saved; queued writes are left alone."""
+        self._timer.stop()
+        self._dirty = False
+        self.state_changed.emit("saved")
+
+    # saving
+
+    def flush(self):
+        """Save now if there are unsaved edits."""
+        self._timer.stop()
+        if self._dirty:
+            self._start_write()
+
+    def save_now(self, wait=False):
+        """Save regardless of dirty state; with wait=True block until it is on disk."""
+        self._timer.stop()
+        if wait and self._future and not self._future.done():
+            self._future.result()
+        self._start_write(force=True)
+        if wait and self._future:
+            self._future.result()
+
+    def sync(self):
+        """Block until unsaved edits (if any) and running writes are on disk."""
+        self._timer.stop()
+        if self._future and not self._future.done():
+            self._future.result()
+        if self._dirty:
+            self._start_write()
+            self._future.result()
+
+    def discard(self, doc_id):
+        """Drop doc_id's queued write and wait until none of its writes is running."""
+        future = self._futures.pop(doc_id, None)
+        if future is not None:
+            future.cancel()
+            # writes run in order, so once this no-op ran the earlier ones are done
+            self._executor.submit(lambda: None).result()
+
+    def shutdown(self):
+        """Write any pending edits and stop the worker."""
+        if self._dirty:
+            self.save_now(wait=True)
+        self._executor.shutdown(wait=True)
+
+    def _start_write(self, force=False):
+        if not (self._dirty or force):
+            return
+
+        job = self.snapshot()
+        self._dirty = False
+        self.state_changed.emit("saving")
+
+        doc_id = job["doc_id"]
+        previous = self._futures.get(doc_id)
+        if previous is not None:
+            previous.cancel()  # superseded if it has not started yet
+
+        future = self._executor.submit(self.store.save_document, **job)
+        future.doc_id = doc_id
+        self._future = self._futures[doc_id] = future
+        future.add_done_callback(self._write_done.emit)
+
+    def _on_write_done(self, future):
+        if self._futures.get(future.doc_id) is future:
+            del self._futures[future.doc_id]
+        if future.cancelled():
+            return
+
+        error = future.exception()
+        if error:
+            self.logger.error(f"Autosave failed for {future.doc_id}: {error}")
+            self._dirty = True
+            self.state_changed.emit("error")
+        else:
+            self.saved.emit(future.doc_id)
+            if future is self._future and not self._dirty:
+                self.state_changed.emit("saved")
@@ -0,0 +1,255 @@
+import os
+import re
+import uuid
+import logging
+import argparse
+import threading
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import fitz
+
+from .writing_store import WritingStore, default_data_dir
+
+IMPORTABLE = (".html", ".htm", ".pdf")
+
+BODY_RE = re.compile(r"<body[^>]*>(.*)</body>", re.IGNORECASE | re.DOTALL)
+TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+SCRIPT_RE = re.compile(r"<script\b.*?</script>", re.IGNORECASE | re.DOTALL)
+
+
+# process pool workers (module level so they can be pickled)
+
+
+def pdf_pages_html(path, start, stop):
+    """Return the HTML of pages start..stop-1 of one PDF, opening it once."""
+    with fitz.open(path) as doc:
+        return [doc[page_no].get_text("html") for page_no in range(start, stop)]
+
+
+def pdf_to_html(path):
+    """Convert a whole PDF to one HTML string in the current process."""
+    with fitz.open(path) as doc:
+        return "".join(page.get_text("html") for page in doc)
+
+
+# html helpers
+
+
+def read_html(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("cp1252", errors="replace")
+
+
+def normalize_html(html_content):
+    """Reduce an imported page to a clean document the editor can load."""
+    match = BODY_RE.search(html_content)
+    body = match.group(1) if match else html_content
+    body = SCRIPT_RE.sub("", body)
+    return (
+        '<!DOCTYPE HTML><html><head><meta charset="utf-8" /></head>'
+        f"<body>{body.strip()}</body></html>"
+    )
+
+
+def html_title(html_content, fallback):
+    match = TITLE_RE.search(html_content)
+    title = re.sub(r"\s+", " ", match.group(1)).strip() if match else ""
+    return title or fallback
+
+
+class ImportCancelled(Exception):
+    pass
+
+
+class BulkImporter:
+    """
+    Imports a folder of .html/.htm/.pdf files into a WritingStore.
+
+    PDF pages are converted in parallel in a process pool, PAGES_PER_TASK
+    pages per task with at most two tasks per worker in flight, HTML is
+    normalized, and finished documents are registered with
+    store.save_documents in batches so the index is committed once per batch
+    instead of once per file. A file that cannot be read or converted is
+    logged and skipped.
+    """
+
+    PAGES_PER_TASK = 16
+
+    def __init__(self, store, logger, workers=None, batch_size=500, font=None, font_size=None):
+        self.store = store
+        self.logger = logger
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.font = font
+        self.font_size = font_size
+
+    @staticmethod
+    def find_files(root):
+        paths = []
+        for dirpath, _, filenames in os.walk(root):
+            for name in filenames:
+                if name.lower().endswith(IMPORTABLE):
+                    paths.append(os.path.join(dirpath, name))
+        return sorted(paths)
+
+    def run(self, root, progress=None, cancel_event=None):
+        """
+        Import every supported file under root and return the new doc_ids.
+
+        :param progress: callback(done, total, message) in units of HTML files + PDF pages
+        :param cancel_event: threading.Event; when set, pending work is dropped and
+            only batches already committed are kept
+        """
+        cancel_event = cancel_event or threading.Event()
+        paths = self.find_files(root)
+        html_paths = [p for p in paths if not p.lower().endswith(".pdf")]
+        pdf_pages = {}
+        for path in paths:
+            if path.lower().endswith(".pdf"):
+                try:
+                    with fitz.open(path) as doc:
+                        page_count = doc.page_count
+                except (RuntimeError, ValueError) as e:
+                    self.logger.error(f"Skipping unreadable PDF {path}: {e}")
+                    continue
+                if page_count == 0:
+                    self.logger.warning(f"Skipping PDF without pages {path}")
+                    continue
+                pdf_pages[path] = page_count
+
+        total = len(html_paths) + sum(pdf_pages.values())
+        done = 0
+        imported = []
+        batch = []
+
+        def report(message):
+            if progress:
+                progress(done, total, message)
+
+        def flush():
+            if batch:
+                imported.extend(self.store.save_documents(batch))
+                batch.clear()
+
+        def add(html_content, title):
+            batch.append(
+                {
+                    "doc_id": str(uuid.uuid4()),
+                    "html_content": html_content,
+                    "title": title,
+                    "font": self.font,
+                    "font_size": self.font_size,
+                }
+            )
+            if len(batch) >= self.batch_size:
+                flush()
+
+        cancelled = False
+        try:
+            for path in html_paths:
+                if cancel_event.is_set():
+                    raise ImportCancelled()
+                try:
+                    raw = read_html(path)
+                except OSError as e:
+                    self.logger.error(f"Skipping unreadable file {path}: {e}")
+                else:
+                    stem = os.path.splitext(os.path.basename(path))[0]
+                    add(normalize_html(raw), html_title(raw, stem))
+                done += 1
+                report(os.path.basename(path))
+
+            if pdf_pages:
+                pages = {path: [None] * count for path, count in pdf_pages.items()}
+                remaining = dict(pdf_pages)
+                chunks = (
+                    (path, start, min(start + self.PAGES_PER_TASK, count))
+                    for path, count in pdf_pages.items()
+                    for start in range(0, count, self.PAGES_PER_TASK)
+                )
+
+                with ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                ) as pool:
+                    running = {}
+                    try:
+                        while True:
+                            # keep the pool busy without queueing every page up front
+                            while len(running) < 2 * self.workers:
+                                chunk = next(chunks, None)
+                                if chunk is None:
+                                    break
+                                if chunk[0] not in pages:
+                                    done += chunk[2] - chunk[1]  # its file failed
+                                    continue
+                                running[pool.submit(pdf_pages_html, *chunk)] = chunk
+                            if not running:
+                                break
+
+                            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                            for future in finished:
+                                if cancel_event.is_set():
+                                    raise ImportCancelled()
+
+                                path, start, stop = running.pop(future)
+                                done += stop - start
+                                if path not in pages:
+                                    continue  # an earlier chunk of it failed
+                                try:
+                                    pages[path][start:stop] = future.result()
+                                except Exception as e:
+                                    self.logger.error(f"Skipping PDF {path}: {e}")
+                                    del pages[path]
+                                    continue
+
+                                remaining[path] -= stop - start
+                                report(f"{os.path.basename(path)} p.{stop}")
+                                if remaining[path] == 0:
+                                    stem = os.path.splitext(os.path.basename(path))[0]
+                                    add(normalize_html("".join(pages.pop(path))), stem)
+                    finally:
+                        pool.shutdown(wait=True, cancel_futures=True)
+        except ImportCancelled:
+            cancelled = True
+        finally:
+            flush()  # keep what was fully converted, whatever stopped the import
+
+        if cancelled:
+            self.logger.info(f"Import cancelled after {len(imported)} documents.")
+        else:
+            self.logger.info(f"Imported {len(imported)} documents from {root}")
+        return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bulk import a folder of .html/.pdf files into the writing store."
+    )
+    parser.add_argument("folder")
+    parser.add_argument("--data-dir", default=default_data_dir())
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    logger = logging.getLogger("character_writing_app")
+
+    store = WritingStore(base_dir=args.data_dir, logger=logger, journaled=True, search=True)
+
+    def progress(done, total, message):
+        print(f"\r[{done}/{total}] {message[:60]:<60}", end="", flush=True)
+
+    doc_ids = BulkImporter(store, logger, workers=args.workers).run(
+        args.folder, progress=progress
+    )
+    store.close()
+    print(f"\nImported {len(doc_ids)} documents.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import brotli
+
+COMPRESSED_SUFFIX = ".br"
+
+
+def is_compressed(filename):
+    return str(filename).endswith(COMPRESSED_SUFFIX)
+
+
+def read_html_file(path):
+    """Read an HTML body from disk, decompressing brotli files transparently."""
+    if is_compressed(path):
+        with open(path, "rb") as f:
+            return brotli.decompress(f.read()).decode("utf-8")
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def write_html_file(path, html_content, quality=5):
+    """Write an HTML body, brotli-compressed when path ends in .br"""
+    if is_compressed(path):
+        data = brotli.compress(
+            html_content.encode("utf-8"), mode=brotli.MODE_TEXT, quality=quality
+        )
+        with open(path, "wb") as f:
+            f.write(data)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html_content)
@@ -0,0 +1,74 @@
+import threading
+from collections import OrderedDict
+
+
+class DocumentCache:
+    """
+    Size-bounded LRU cache of document HTML keyed by doc_id.
+
+    Every entry carries a version (file mtime/size or last_modified) and a
+    lookup with a different version counts as a miss, so edits made outside
+    the store are picked up. Sizes are counted in characters, which is close
+    to bytes for Qt's mostly-ASCII HTML.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()  # doc_id -> (version, html)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, doc_id, version):
+        """Return cached html for doc_id if it matches version, else None."""
+        with self._lock:
+            entry = self._entries.get(doc_id)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(doc_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, doc_id, version, html):
+        if len(html) > self.max_bytes:
+            self.invalidate(doc_id)
+            return
+
+        with self._lock:
+            self._discard(doc_id)
+            self._entries[doc_id] = (version, html)
+            self._size += len(html)
+
+            # evict least recently used until we fit again
+            while self._size > self.max_bytes:
+                _, (_, old_html) = self._entries.popitem(last=False)
+                self._size -= len(old_html)
+
+    def invalidate(self, doc_id):
+        with self._lock:
+            self._discard(doc_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        """Return hit/miss counters and current usage."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _discard(self, doc_id):
+        entry = self._entries.pop(doc_id, None)
+        if entry:
+            self._size -= len(entry[1])
@@ -0,0 +1,158 @@
+import os
+import json
+import threading
+
+
+class IndexJournal:
+    """
+    Append-only journal for the WritingStore index.
+
+    Every mutation appends one JSON line to `<index_file>.log` instead of
+    rewriting the whole index. Once the log holds `compact_every` entries it is
+    rotated to `<index_file>.log.1` and a compacted snapshot (the regular
+    index file) is written on a background thread.
+    """
+
+    def __init__(self, index_file, compact_every=500, logger=None):
+        self.logger = logger
+        self.index_file = index_file
+        self.log_file = f"{index_file}.log"
+        self.pending_file = f"{index_file}.log.1"
+        self.compact_every = compact_every
+
+        self._lock = threading.Lock()
+        self._log = None
+        self._entries = 0
+        self._compactor = None
+
+    # loading
+
+    def read(self):
+        """
+        Return the index rebuilt from the snapshot plus any journal entries,
+        without touching the files (load() also opens the log for writing).
+        """
+        index = {}
+        if os.path.exists(self.index_file):
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                index = json.load(f)
+
+        self._replay(self.pending_file, index)
+        self._entries = self._replay(self.log_file, index)
+        return index
+
+    def load(self):
+        """Return the index rebuilt from the snapshot plus any journal entries."""
+        had_pending = os.path.exists(self.pending_file)
+        index = self.read()
+
+        self._log = open(self.log_file, "a", encoding="utf-8")
+
+        # a leftover rotated log means a compaction was interrupted: finish it now
+        if had_pending:
+            self._write_snapshot(dict(index))
+            os.remove(self.pending_file)
+
+        return index
+
+    def _replay(self, path, index):
+        """Apply journal entries from path to index, return the number applied."""
+        if not os.path.exists(path):
+            return 0
+
+        applied = 0
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # torn final line from a crash mid-append
+                    if self.logger:
+                        self.logger.warning(f"Skipping damaged journal entry in {path}")
+                    continue
+
+                if entry["op"] == "set":
+                    index[entry["id"]] = entry["meta"]
+                elif entry["op"] == "del":
+                    index.pop(entry["id"], None)
+                applied += 1
+        return applied
+
+    # mutations
+
+    def record_set(self, doc_id, meta, index):
+        self._append({"op": "set", "id": doc_id, "meta": meta}, index)
+
+    def record_delete(self, doc_id, index):
+        self._append({"op": "del", "id": doc_id}, index)
+
+    def record_many(self, doc_ids, index):
+        """Journal the current state of several documents with one flush."""
+        with self._lock:
+            for doc_id in doc_ids:
+                if doc_id in index:
+                    entry = {"op": "set", "id": doc_id, "meta": index[doc_id]}
+                else:
+                    entry = {"op": "del", "id": doc_id}
+                self._log.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                self._entries += 1
+            self._log.flush()
+            self._maybe_compact(index)
+
+    def _append(self, entry, index):
+        with self._lock:
+            self._log.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._log.flush()
+            self._entries += 1
+            self._maybe_compact(index)
+
+    # compaction
+
+    def _maybe_compact(self, index):
+        """Rotate the log and snapshot in the background (caller holds the lock)."""
+        if self._entries < self.compact_every:
+            return
+        if self._compactor and self._compactor.is_alive():
+            return
+        if os.path.exists(self.pending_file):
+            return  # a failed compaction left it behind, keep appending
+
+        self._log.close()
+        os.replace(self.log_file, self.pending_file)
+        self._log = open(self.log_file, "a", encoding="utf-8")
+        self._entries = 0
+
+        snapshot = dict(index)
+        self._compactor = threading.Thread(
+            target=self._compact, args=(snapshot,), daemon=True
+        )
+        self._compactor.start()
+
+    def _compact(self, snapshot):
+        try:
+            self._write_snapshot(snapshot)
+            os.remove(self.pending_file)
+            if self.logger:
+                self.logger.debug(f"Index compacted ({len(snapshot)} documents).")
+        except OSError as e:
+            # the rotated log is kept and replayed on next load
+            if self.logger:
+                self.logger.error(f"Index compaction failed: {e}")
+
+    def _write_snapshot(self, snapshot):
+        """Atomically replace the snapshot file."""
+        tmp_file = f"{self.index_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.index_file)
+
+    def close(self):
+        """Wait for a running compaction and close the log file."""
+        if self._compactor:
+            self._compactor.join()
+        with self._lock:
+            if self._log:
+                self._log.close()
+                self._log = None
@@ -0,0 +1,138 @@
+import json
+import base64
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+
+class MetadataIndex:
+    """
+    In-memory sorted secondary indexes over WritingStore metadata.
+
+    Each indexed field keeps a sorted list of (key, doc_id) pairs, so sorting,
+    range and prefix filters are a bisect plus a slice instead of a scan over
+    the whole index. Text keys are case-folded. Pages are addressed with an
+    opaque cursor (the last key returned) so inserts between page fetches do
+    not shift or repeat rows.
+    """
+
+    FIELDS = ("title", "last_modified", "font")
+
+    def __init__(self, fields=FIELDS):
+        self.fields = fields
+        self._sorted = {field: [] for field in fields}
+        self._keys = {}  # doc_id -> {field: key}
+        self._lock = threading.RLock()
+
+    # maintenance
+
+    def rebuild(self, index):
+        with self._lock:
+            self._keys = {
+                doc_id: self._keys_for(meta) for doc_id, meta in index.items()
+            }
+            for field in self.fields:
+                self._sorted[field] = sorted(
+                    (keys[field], doc_id) for doc_id, keys in self._keys.items()
+                )
+
+    def update(self, doc_id, meta):
+        with self._lock:
+            self._discard(doc_id)
+            keys = self._keys_for(meta)
+            self._keys[doc_id] = keys
+            for field in self.fields:
+                insort(self._sorted[field], (keys[field], doc_id))
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._discard(doc_id)
+
+    def _discard(self, doc_id):
+        keys = self._keys.pop(doc_id, None)
+        if keys is None:
+            return
+        for field in self.fields:
+            entries = self._sorted[field]
+            pos = bisect_left(entries, (keys[field], doc_id))
+            if pos < len(entries) and entries[pos] == (keys[field], doc_id):
+                del entries[pos]
+
+    def _keys_for(self, meta):
+        return {field: self.normalize(meta.get(field)) for field in self.fields}
+
+    @staticmethod
+    def normalize(value):
+        return "" if value is None else str(value).casefold()
+
+    # querying
+
+    def query(
+        self,
+        sort_by="title",
+        descending=False,
+        prefix=None,
+        start=None,
+        end=None,
+        where=None,
+        limit=50,
+        cursor=None,
+    ):
+        """
+        Return (doc_ids, next_cursor) ordered by sort_by.
+
+        :param prefix: keep keys of sort_by starting with prefix
+        :param start/end: keep keys with start <= key < end
+        :param where: {field: value} equality filters on other indexed fields
+        :param cursor: next_cursor of the previous page; None for the first page
+        """
+        if sort_by not in self._sorted:
+            raise ValueError(f"'{sort_by}' is not an indexed field")
+
+        with self._lock:
+            entries = self._sorted[sort_by]
+
+            lo, hi = 0, len(entries)
+            if prefix:
+                prefix = self.normalize(prefix)
+                lo = bisect_left(entries, (prefix,))
+                hi = bisect_left(entries, (prefix + "\U0010ffff",))
+            if start is not None:
+                lo = max(lo, bisect_left(entries, (self.normalize(start),)))
+            if end is not None:
+                hi = min(hi, bisect_left(entries, (self.normalize(end),)))
+
+            if cursor:
+                after = tuple(self._decode_cursor(cursor))
+                if descending:
+                    hi = min(hi, bisect_left(entries, after))
+                else:
+                    lo = max(lo, bisect_right(entries, after))
+
+            where = {f: self.normalize(v) for f, v in (where or {}).items()}
+            positions = range(hi - 1, lo - 1, -1) if descending else range(lo, hi)
+
+            page = []
+            last = None
+            for pos in positions:
+                key, doc_id = entries[pos]
+                last = (key, doc_id)
+                if where and any(
+                    self._keys[doc_id].get(f) != v for f, v in where.items()
+                ):
+                    continue
+                page.append(doc_id)
+                if limit and len(page) >= limit:
+                    break
+            else:
+                last = None  # ran off the end of the range
+
+        next_cursor = self._encode_cursor(last) if last else None
+        return page, next_cursor
+
+    @staticmethod
+    def _encode_cursor(entry):
+        return base64.urlsafe_b64encode(json.dumps(list(entry)).encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor):
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()))
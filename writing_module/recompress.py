@@ -0,0 +1,32 @@
+import logging
+import argparse
+
+from .writing_store import WritingStore, default_data_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Recompress stored writing documents with brotli (or undo it)."
+    )
+    parser.add_argument("--data-dir", default=default_data_dir())
+    parser.add_argument(
+        "--decompress", action="store_true", help="write plain .html files instead"
+    )
+    parser.add_argument("--quality", type=int, default=11, help="brotli quality 0-11")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    logger = logging.getLogger("character_writing_app")
+
+    store = WritingStore(base_dir=args.data_dir, logger=logger, journaled=True)
+    before, after = store.recompress_documents(
+        compress=not args.decompress, quality=args.quality
+    )
+    store.close()
+
+    ratio = before / after if after else 0
+    print(f"{len(store.index)} documents: {before:,} -> {after:,} bytes ({ratio:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
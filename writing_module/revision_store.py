@@ -0,0 +1,246 @@
+import os
+import json
+import shutil
+import hashlib
+import difflib
+import threading
+from datetime import datetime, timedelta
+
+import brotli
+
+
+class RevisionStore:
+    """
+    Per-document revision history stored as full snapshots plus line deltas.
+
+    Each document gets `revisions/<doc_id>/` holding a `manifest.jsonl` and one
+    brotli blob per revision. A revision is either a full snapshot or a delta
+    against the previous revision; a new snapshot is forced once a delta chain
+    reaches `max_chain`, so any revision is rebuilt from at most `max_chain`
+    deltas. Qt writes one block per line, so line deltas are block deltas.
+    """
+
+    def __init__(self, base_dir, max_chain=20, keep_last=200, logger=None):
+        self.base_dir = base_dir
+        self.max_chain = max_chain
+        self.keep_last = keep_last
+        self.logger = logger
+
+        self._lock = threading.RLock()
+        self._latest = {}  # doc_id -> (rev, sha, lines) of the newest revision
+
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    # public api
+
+    def record(self, doc_id, html_content):
+        """Store html_content as a new revision, return its number (None if unchanged)."""
+        sha = hashlib.sha1(html_content.encode("utf-8")).hexdigest()
+        lines = html_content.splitlines(keepends=True)
+
+        with self._lock:
+            entries = self._read_manifest(doc_id)
+            last = entries[-1] if entries else None
+            if last and last["sha"] == sha:
+                return None
+
+            rev = last["rev"] + 1 if last else 1
+            entry = {
+                "rev": rev,
+                "timestamp": datetime.now().isoformat(),
+                "sha": sha,
+                "kind": "full",
+                "chain": 0,
+                "length": len(html_content),
+            }
+            payload = html_content
+
+            if last and last["chain"] + 1 < self.max_chain:
+                base_lines = self._latest_lines(doc_id, entries)
+                ops = self._diff(base_lines, lines)
+                delta = json.dumps(ops, ensure_ascii=False)
+                # a delta that rewrites most of the document is not worth chaining
+                if len(delta) < len(html_content) // 2:
+                    entry["kind"] = "delta"
+                    entry["chain"] = last["chain"] + 1
+                    payload = delta
+
+            blob = brotli.compress(payload.encode("utf-8"), mode=brotli.MODE_TEXT, quality=5)
+            self._write_blob(doc_id, rev, blob)
+            entry["size"] = len(blob)
+
+            with open(self._manifest_path(doc_id), "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            entries.append(entry)
+            self._latest[doc_id] = (rev, sha, lines)
+
+            # keep history bounded without a separate maintenance pass
+            if self.keep_last and len(entries) > self.keep_last + self.max_chain:
+                self._prune(doc_id, entries, keep_last=self.keep_last)
+
+            return rev
+
+    def list_revisions(self, doc_id):
+        """Return revision metadata (rev, timestamp, kind, size, length) oldest first."""
+        with self._lock:
+            return [
+                {k: e[k] for k in ("rev", "timestamp", "kind", "size", "length")}
+                for e in self._read_manifest(doc_id)
+            ]
+
+    def get_revision(self, doc_id, rev):
+        """Return the html of revision rev, or None if it does not exist."""
+        with self._lock:
+            entries = self._read_manifest(doc_id)
+            position = next(
+                (i for i, e in enumerate(entries) if e["rev"] == rev), None
+            )
+            if position is None:
+                return None
+            return "".join(self._materialize(doc_id, entries, position))
+
+    def prune(self, doc_id, keep_last=None, max_age_days=None):
+        """Drop old revisions, keeping the newest keep_last and/or those younger than max_age_days."""
+        with self._lock:
+            entries = self._read_manifest(doc_id)
+            return self._prune(doc_id, entries, keep_last, max_age_days)
+
+    def prune_all(self, keep_last=None, max_age_days=None):
+        removed = 0
+        for doc_id in os.listdir(self.base_dir):
+            removed += self.prune(doc_id, keep_last, max_age_days)
+        return removed
+
+    def delete(self, doc_id):
+        """Remove the whole history of a document."""
+        with self._lock:
+            self._latest.pop(doc_id, None)
+            shutil.rmtree(self._doc_dir(doc_id), ignore_errors=True)
+
+    # internals
+
+    def _prune(self, doc_id, entries, keep_last=None, max_age_days=None):
+        if not entries:
+            return 0
+
+        first_kept = 0
+        if keep_last is not None:
+            first_kept = max(first_kept, len(entries) - max(keep_last, 1))
+        if max_age_days is not None:
+            cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+            young = [i for i, e in enumerate(entries) if e["timestamp"] >= cutoff]
+            # the newest revision always survives
+            first_kept = max(first_kept, young[0] if young else len(entries) - 1)
+
+        if first_kept == 0:
+            return 0
+
+        # the oldest survivor becomes a snapshot so the chain no longer needs its parents
+        head = entries[first_kept]
+        if head["kind"] == "delta":
+            html_content = "".join(self._materialize(doc_id, entries, first_kept))
+            blob = brotli.compress(
+                html_content.encode("utf-8"), mode=brotli.MODE_TEXT, quality=5
+            )
+            self._write_blob(doc_id, head["rev"], blob)
+            head.update(kind="full", chain=0, size=len(blob))
+
+            chain = 0
+            for entry in entries[first_kept + 1 :]:
+                if entry["kind"] == "full":
+                    break
+                chain += 1
+                entry["chain"] = chain
+
+        for entry in entries[:first_kept]:
+            blob_path = self._blob_path(doc_id, entry["rev"])
+            if os.path.exists(blob_path):
+                os.remove(blob_path)
+
+        self._write_manifest(doc_id, entries[first_kept:])
+        return first_kept
+
+    def _latest_lines(self, doc_id, entries):
+        cached = self._latest.get(doc_id)
+        if cached and cached[0] == entries[-1]["rev"]:
+            return cached[2]
+        return self._materialize(doc_id, entries, len(entries) - 1)
+
+    def _materialize(self, doc_id, entries, position):
+        """Rebuild the lines of entries[position] from its nearest snapshot."""
+        start = position
+        while entries[start]["kind"] != "full":
+            start -= 1
+
+        lines = self._read_blob(doc_id, entries[start]["rev"]).splitlines(
+            keepends=True
+        )
+        for entry in entries[start + 1 : position + 1]:
+            ops = json.loads(self._read_blob(doc_id, entry["rev"]))
+            lines = self._apply(lines, ops)
+        return lines
+
+    @staticmethod
+    def _diff(old_lines, new_lines):
+        """Encode new_lines as copy ranges from old_lines plus inserted lines."""
+        ops = []
+        matcher = difflib.SequenceMatcher(None, old_lines, new_lines)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                ops.append(["c", i1, i2])
+            elif j2 > j1:  # replace / insert
+                ops.append(["i", new_lines[j1:j2]])
+        return ops
+
+    @staticmethod
+    def _apply(old_lines, ops):
+        lines = []
+        for op in ops:
+            if op[0] == "c":
+                lines.extend(old_lines[op[1] : op[2]])
+            else:
+                lines.extend(op[1])
+        return lines
+
+    # files
+
+    def _doc_dir(self, doc_id):
+        return os.path.join(self.base_dir, doc_id)
+
+    def _manifest_path(self, doc_id):
+        return os.path.join(self._doc_dir(doc_id), "manifest.jsonl")
+
+    def _blob_path(self, doc_id, rev):
+        return os.path.join(self._doc_dir(doc_id), f"r{rev:06d}.br")
+
+    def _read_manifest(self, doc_id):
+        path = self._manifest_path(doc_id)
+        if not os.path.exists(path):
+            return []
+
+        entries = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    if self.logger:
+                        self.logger.warning(f"Skipping damaged revision entry for {doc_id}")
+        return entries
+
+    def _write_manifest(self, doc_id, entries):
+        path = self._manifest_path(doc_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+        os.replace(tmp_path, path)
+
+    def _write_blob(self, doc_id, rev, blob):
+        os.makedirs(self._doc_dir(doc_id), exist_ok=True)
+        with open(self._blob_path(doc_id, rev), "wb") as f:
+            f.write(blob)
+
+    def _read_blob(self, doc_id, rev):
+        with open(self._blob_path(doc_id, rev), "rb") as f:
+            return brotli.decompress(f.read()).decode("utf-8")
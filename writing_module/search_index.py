@@ -0,0 +1,292 @@
+import re
+import math
+import sqlite3
+import threading
+from array import array
+from html.parser import HTMLParser
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+# BM25 tuning
+K1 = 1.2
+B = 0.75
+
+
+class _TextExtractor(HTMLParser):
+    """Collect visible text from Qt's toHtml() output (skips head/style/script)."""
+
+    SKIP = {"head", "style", "script", "title"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skip += 1
+        elif tag in ("p", "br", "li", "div", "h1", "h2", "h3", "h4", "h5", "h6"):
+            self.parts.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP and self._skip:
+            self._skip -= 1
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+
+def html_to_text(html_content):
+    parser = _TextExtractor()
+    parser.feed(html_content)
+    parser.close()
+    return "".join(parser.parts)
+
+
+def tokenize(text):
+    return [t.lower() for t in TOKEN_RE.findall(text)]
+
+
+class SearchIndex:
+    """
+    Persistent full-text inverted index over writing documents.
+
+    Postings (term -> doc, term frequency, positions) live in a SQLite file
+    next to the store and are replaced per document on every save, so updates
+    cost one document rather than the library. Queries support plain terms
+    (all must match), "quoted phrases" and prefix* terms, ranked with BM25.
+    """
+
+    def __init__(self, db_path, logger=None):
+        self.db_path = db_path
+        self.logger = logger
+
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS docs (
+                doc_id TEXT PRIMARY KEY,
+                length INTEGER NOT NULL,
+                last_modified TEXT
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                tf INTEGER NOT NULL,
+                positions BLOB NOT NULL,
+                PRIMARY KEY (term, doc_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+            """
+        )
+        self.conn.commit()
+
+    # maintenance
+
+    def update(self, doc_id, html_content, title="", last_modified=None):
+        """(Re)index one document."""
+        self.update_many([(doc_id, html_content, title, last_modified)])
+
+    def update_many(self, documents):
+        """(Re)index (doc_id, html_content, title, last_modified) tuples in one transaction."""
+        with self._lock, self.conn:
+            for doc_id, html_content, title, last_modified in documents:
+                tokens = tokenize(title or "") + tokenize(html_to_text(html_content))
+
+                positions = {}
+                for pos, token in enumerate(tokens):
+                    positions.setdefault(token, array("I")).append(pos)
+
+                self.conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+                self.conn.executemany(
+                    "INSERT INTO postings (term, doc_id, tf, positions) VALUES (?, ?, ?, ?)",
+                    (
+                        (term, doc_id, len(pos_list), pos_list.tobytes())
+                        for term, pos_list in positions.items()
+                    ),
+                )
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO docs (doc_id, length, last_modified) VALUES (?, ?, ?)",
+                    (doc_id, len(tokens), last_modified),
+                )
+
+    def remove(self, doc_id):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+            self.conn.execute("DELETE FROM docs WHERE doc_id = ?", (doc_id,))
+
+    def sync(self, store):
+        """
+        Index documents that are new or changed since last run, drop deleted ones.
+
+        Runs on a background thread while the app saves: each document is
+        checked and indexed under store._lock, so a save that lands meanwhile
+        is never overwritten with the body read before it.
+        """
+        with self._lock:
+            indexed = dict(self.conn.execute("SELECT doc_id, last_modified FROM docs"))
+
+        stale = 0
+        for doc_id in indexed:
+            with store._lock:
+                if doc_id not in store.index:
+                    self.remove(doc_id)
+                    stale += 1
+
+        changed = 0
+        for doc_id in list(store.index):
+            with store._lock:
+                meta = store.index.get(doc_id)
+                if meta is None or indexed.get(doc_id, object()) == meta.get(
+                    "last_modified"
+                ):
+                    continue
+                self.update(
+                    doc_id,
+                    store.get_document(doc_id),
+                    meta.get("title", ""),
+                    meta.get("last_modified"),
+                )
+                changed += 1
+
+        if self.logger and (changed or stale):
+            self.logger.info(
+                f"Search index synced: {changed} indexed, {stale} removed."
+            )
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    # querying
+
+    def search(self, query, limit=None):
+        """Return doc_ids matching every clause of query, best match first."""
+        clauses = self._parse(query)
+        if not clauses:
+            return []
+
+        with self._lock:
+            total_docs, avg_len = self.conn.execute(
+                "SELECT COUNT(*), AVG(length) FROM docs"
+            ).fetchone()
+            if not total_docs:
+                return []
+
+            scores = None
+            for clause in clauses:
+                matches = self._match_clause(clause)  # doc_id -> frequency
+                idf = math.log(1 + (total_docs - len(matches) + 0.5) / (len(matches) + 0.5))
+                clause_scores = {doc_id: (idf, freq) for doc_id, freq in matches.items()}
+
+                if scores is None:
+                    scores = {doc_id: [v] for doc_id, v in clause_scores.items()}
+                else:
+                    scores = {
+                        doc_id: parts + [clause_scores[doc_id]]
+                        for doc_id, parts in scores.items()
+                        if doc_id in clause_scores
+                    }
+                if not scores:
+                    return []
+
+            lengths = self._doc_lengths(list(scores))
+
+        ranked = []
+        for doc_id, parts in scores.items():
+            norm = K1 * (1 - B + B * lengths.get(doc_id, avg_len) / (avg_len or 1))
+            score = sum(idf * freq * (K1 + 1) / (freq + norm) for idf, freq in parts)
+            ranked.append((score, doc_id))
+        ranked.sort(key=lambda r: (-r[0], r[1]))
+
+        doc_ids = [doc_id for _, doc_id in ranked]
+        return doc_ids[:limit] if limit else doc_ids
+
+    @staticmethod
+    def _parse(query):
+        """Split a query into ("term"|"prefix"|"phrase", tokens) clauses."""
+        clauses = []
+        for phrase, word in QUERY_RE.findall(query):
+            if phrase:
+                tokens = tokenize(phrase)
+                if len(tokens) == 1:
+                    clauses.append(("term", tokens))
+                elif tokens:
+                    clauses.append(("phrase", tokens))
+                continue
+
+            is_prefix = word.endswith("*")
+            tokens = tokenize(word)
+            if not tokens:
+                continue
+            if is_prefix and len(tokens) == 1:
+                clauses.append(("prefix", tokens))
+            elif len(tokens) == 1:
+                clauses.append(("term", tokens))
+            else:
+                # o'neil, well-known ... behave like a phrase
+                clauses.append(("phrase", tokens))
+        return clauses
+
+    def _match_clause(self, clause):
+        kind, tokens = clause
+        if kind == "term":
+            return dict(
+                self.conn.execute(
+                    "SELECT doc_id, tf FROM postings WHERE term = ?", (tokens[0],)
+                )
+            )
+
+        if kind == "prefix":
+            matches = {}
+            for doc_id, tf in self.conn.execute(
+                "SELECT doc_id, tf FROM postings WHERE term >= ? AND term < ?",
+                (tokens[0], tokens[0] + "\U0010ffff"),
+            ):
+                matches[doc_id] = matches.get(doc_id, 0) + tf
+            return matches
+
+        # phrase: intersect docs then check consecutive positions
+        postings = [self._positions(token) for token in tokens]
+        common = set(postings[0])
+        for p in postings[1:]:
+            common &= set(p)
+
+        matches = {}
+        for doc_id in common:
+            starts = set(postings[0][doc_id])
+            for offset, p in enumerate(postings[1:], start=1):
+                starts &= {pos - offset for pos in p[doc_id]}
+                if not starts:
+                    break
+            if starts:
+                matches[doc_id] = len(starts)
+        return matches
+
+    def _positions(self, term):
+        result = {}
+        for doc_id, blob in self.conn.execute(
+            "SELECT doc_id, positions FROM postings WHERE term = ?", (term,)
+        ):
+            positions = array("I")
+            positions.frombytes(blob)
+            result[doc_id] = positions
+        return result
+
+    def _doc_lengths(self, doc_ids):
+        lengths = {}
+        for i in range(0, len(doc_ids), 500):
+            chunk = doc_ids[i : i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            lengths.update(
+                self.conn.execute(
+                    f"SELECT doc_id, length FROM docs WHERE doc_id IN ({placeholders})",
+                    chunk,
+                )
+            )
+        return lengths
@@ -0,0 +1,211 @@
+import os
+import sqlite3
+import logging
+import argparse
+import threading
+
+from .writing_store import WritingStore, default_data_dir
+from .index_journal import IndexJournal
+from .document_cache import DocumentCache
+
+
+class SQLiteWritingStore(WritingStore):
+    """
+    WritingStore backed by a single SQLite database in WAL mode.
+
+    Metadata and HTML bodies live in one `documents` table, so a save is one
+    transaction and startup only reads the small metadata columns. `index`
+    keeps the same {doc_id: meta} shape the rest of the app reads.
+    """
+
+    def __init__(
+        self,
+        db_path=None,
+        logger=None,
+        cache_bytes=64 * 1024 * 1024,
+        revisions=False,
+        search=False,
+    ):
+
+        self.logger = logger
+
+        if db_path is None:
+            db_path = os.path.join(default_data_dir(), "writing.db")
+
+        self.db_path = os.path.abspath(db_path)
+        self.base_dir = os.path.dirname(self.db_path)
+        self.html_dir = None
+        self.index_file = None
+        self.index = {}
+        self.journal = None
+        self.cache = DocumentCache(max_bytes=cache_bytes)
+
+        os.makedirs(self.base_dir, exist_ok=True)
+
+        # saves may come from a worker thread, so share one guarded connection
+        self._lock = threading.RLock()
+        self._db_lock = threading.RLock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                doc_id TEXT PRIMARY KEY,
+                title TEXT,
+                font TEXT,
+                font_size REAL,
+                last_modified TEXT,
+                html TEXT
+            )
+            """
+        )
+        self.conn.commit()
+
+        self.logger.debug(f"SQLite writing store opened at {self.db_path}")
+
+        self.load_index()
+
+        self.logger.debug("Index loaded")
+
+        self._open_extensions(revisions=revisions, search=search)
+
+    def load_index(self):
+        with self._db_lock:
+            rows = self.conn.execute(
+                "SELECT doc_id, title, font, font_size, last_modified FROM documents"
+            ).fetchall()
+        self.index = {row[0]: self._row_to_meta(row) for row in rows}
+
+    def close(self):
+        self._close_extensions()
+        with self._db_lock:
+            self.conn.close()
+
+    # storage primitives
+
+    def _body_filename(self, doc_id):
+        return f"{doc_id}.html"  # nominal, bodies live in the html column
+
+    def _body_version(self, doc_id, meta):
+        # every write goes through this store and bumps last_modified
+        return meta.get("last_modified")
+
+    def _read_body(self, doc_id, meta):
+        with self._db_lock:
+            row = self.conn.execute(
+                "SELECT html FROM documents WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _persist_document(self, doc_id, html_content, meta):
+        with self._db_lock, self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO documents (doc_id, title, font, font_size, last_modified, html)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(doc_id) DO UPDATE SET
+                    title = excluded.title,
+                    font = excluded.font,
+                    font_size = excluded.font_size,
+                    last_modified = excluded.last_modified,
+                    html = excluded.html
+                """,
+                self._meta_to_row(doc_id, meta, html_content),
+            )
+        self.index[doc_id] = meta
+
+    def _persist_documents(self, batch):
+        with self._db_lock, self.conn:
+            self.conn.executemany(
+                """
+                INSERT OR REPLACE INTO documents
+                    (doc_id, title, font, font_size, last_modified, html)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [self._meta_to_row(d, meta, html) for d, html, meta in batch],
+            )
+        for doc_id, _, meta in batch:
+            self.index[doc_id] = meta
+
+    def _remove_document(self, doc_id, meta):
+        with self._db_lock, self.conn:
+            self.conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+
+    # helpers
+
+    @staticmethod
+    def _row_to_meta(row):
+        doc_id, title, font, font_size, last_modified = row
+        return {
+            "filename": f"{doc_id}.html",
+            "font": font,
+            "font_size": font_size,
+            "title": title or "",
+            "last_modified": last_modified,
+        }
+
+    @staticmethod
+    def _meta_to_row(doc_id, meta, html_content):
+        return (
+            doc_id,
+            meta.get("title", ""),
+            meta.get("font"),
+            meta.get("font_size"),
+            meta.get("last_modified"),
+            html_content,
+        )
+
+    # migration
+
+    def import_directory(self, data_dir):
+        """Copy every document of a file-based data/ directory into this database."""
+        # plain mode only reads; a journaled store would create index.json.log
+        source = WritingStore(base_dir=data_dir, logger=self.logger)
+        # changes a journaled app has not compacted into index.json yet
+        source.index = IndexJournal(source.index_file, logger=self.logger).read()
+        rows = []
+        for doc_id, meta in source.index.items():
+            html_content = source.get_document(doc_id)
+            rows.append(self._meta_to_row(doc_id, meta, html_content))
+        source.close()
+
+        with self._db_lock, self.conn:
+            self.conn.executemany(
+                """
+                INSERT OR REPLACE INTO documents
+                    (doc_id, title, font, font_size, last_modified, html)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+        self.cache.clear()
+        self.load_index()
+        self.metadata.rebuild(self.index)
+        if self.search_index:
+            self.search_index.sync(self)
+
+        self.logger.info(f"Imported {len(rows)} documents from {data_dir}")
+        return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Import a file-based writing data/ directory into SQLite."
+    )
+    parser.add_argument("--data-dir", default=default_data_dir())
+    parser.add_argument("--db", default=None, help="defaults to <data-dir>/writing.db")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    logger = logging.getLogger("character_writing_app")
+
+    db_path = args.db or os.path.join(args.data_dir, "writing.db")
+    store = SQLiteWritingStore(db_path=db_path, logger=logger)
+    count = store.import_directory(args.data_dir)
+    store.close()
+    print(f"Imported {count} documents into {db_path}")
+
+
+if __name__ == "__main__":
+    main()
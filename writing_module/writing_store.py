@@ -1,16 +1,48 @@
 import os
 import json
+import threading
 from datetime import datetime
 
+from .index_journal import IndexJournal
+from .document_cache import DocumentCache
+from .revision_store import RevisionStore
+from .search_index import SearchIndex
+from .metadata_index import MetadataIndex
+from .compression import COMPRESSED_SUFFIX, read_html_file, write_html_file
+
+
+def default_data_dir():
+    """Return the app's data/ directory next to the package."""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(current_dir, "..", "data")
+
 
 class WritingStore:
     """
     Simple writing store that saves text files and metadata locally.
     Can be swapped later for MongoDB or SQLite by reimplementing methods.
+
+    With journaled=True index changes are appended to a log and compacted in the
+    background, so a save no longer rewrites the whole index.json.
+    Document bodies are kept in an LRU cache (see `cache.stats()`).
+    With compress=True new saves are written as brotli `.html.br` files; reads
+    handle both forms. With revisions=True every save is also recorded in a
+    delta-compressed RevisionStore (`store.revisions`), and with search=True
+    kept in a full-text SearchIndex queried through `search()`. Sorted
+    metadata indexes back `query_documents()` for paged listings.
     """
 
     def __init__(
-        self, base_dir=None, html_subdir="html", index_file="index.json", logger=None
+        self,
+        base_dir=None,
+        html_subdir="html",
+        index_file="index.json",
+        logger=None,
+        journaled=False,
+        cache_bytes=64 * 1024 * 1024,
+        compress=False,
+        revisions=False,
+        search=False,
     ):
 
         # set logger
@@ -18,14 +50,18 @@ class WritingStore:
 
         if base_dir is None:
             self.logger.debug("base_dir is None. Setting current_dir and base_dir.")
-
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            base_dir = os.path.join(current_dir, "..", "data")
+            base_dir = default_data_dir()
 
         self.base_dir = os.path.abspath(base_dir)  # normalize path
         self.html_dir = os.path.join(self.base_dir, html_subdir)
         self.index_file = os.path.join(self.base_dir, index_file)
         self.index = {}
+        self.journal = (
+            IndexJournal(self.index_file, logger=self.logger) if journaled else None
+        )
+        self.cache = DocumentCache(max_bytes=cache_bytes)
+        self.compress = compress
+        self._lock = threading.RLock()  # saves can arrive from the autosave worker
 
         # ensure directories exist
         os.makedirs(self.html_dir, exist_ok=True)
@@ -36,16 +72,75 @@ class WritingStore:
 
         self.logger.debug("Index loaded")
 
+        self._open_extensions(revisions=revisions, search=search)
+
+    def _open_extensions(self, revisions=False, search=False):
+        """Attach optional revision history and full-text search next to the data."""
+        self.metadata = MetadataIndex()
+        self.metadata.rebuild(self.index)
+
+        self.revisions = (
+            RevisionStore(os.path.join(self.base_dir, "revisions"), logger=self.logger)
+            if revisions
+            else None
+        )
+        self.search_index = None
+        self._search_sync = None
+        if search:
+            self.search_index = SearchIndex(
+                os.path.join(self.base_dir, "search.db"), logger=self.logger
+            )
+            # catch up on documents changed while the index was closed
+            self._search_sync = threading.Thread(
+                target=self.search_index.sync, args=(self,), daemon=True
+            )
+            self._search_sync.start()
+
     def load_index(self):
-        if os.path.exists(self.index_file):
+        if self.journal:
+            self.index = self.journal.load()
+        elif os.path.exists(self.index_file):
             with open(self.index_file, "r", encoding="utf-8") as f:
                 self.index = json.load(f)
         else:
             self.index = {}
 
-    def list_documents(self):
+    def list_documents(self, sort_by=None, descending=False):
         """Return a list of document metadata (title, file, last_modified)"""
-        return list(self.index.values())
+        if sort_by is None:
+            return list(self.index.values())
+        doc_ids, _ = self.metadata.query(
+            sort_by=sort_by, descending=descending, limit=None
+        )
+        return [self.index[doc_id] for doc_id in doc_ids]
+
+    def query_documents(
+        self,
+        sort_by="last_modified",
+        descending=False,
+        prefix=None,
+        start=None,
+        end=None,
+        where=None,
+        limit=50,
+        cursor=None,
+    ):
+        """
+        Page through documents by title, last_modified or font.
+        Returns ([(doc_id, meta), ...], next_cursor); next_cursor is None on the last page.
+        """
+        doc_ids, next_cursor = self.metadata.query(
+            sort_by=sort_by,
+            descending=descending,
+            prefix=prefix,
+            start=start,
+            end=end,
+            where=where,
+            limit=limit,
+            cursor=cursor,
+        )
+        page = [(doc_id, self.index[doc_id]) for doc_id in doc_ids if doc_id in self.index]
+        return page, next_cursor
 
     def get_document(self, doc_id):
         """Return saved html content for given doc_id, or empty string if missing"""
@@ -53,41 +148,214 @@ class WritingStore:
         if not meta:
             return ""
 
-        file_path = os.path.join(self.html_dir, meta["filename"])
-        if os.path.exists(file_path):
-            with open(file_path, "r", encoding="utf-8") as f:
-                return f.read()
-        return ""
+        version = self._body_version(doc_id, meta)
+        if version is None:
+            self.cache.invalidate(doc_id)
+            return ""
+
+        html = self.cache.get(doc_id, version)
+        if html is None:
+            html = self._read_body(doc_id, meta)
+            if html is None:
+                return ""
+            self.cache.put(doc_id, version, html)
+        return html
 
     def save_document(
         self, doc_id, html_content, title=None, font=None, font_size=None
     ):
         """Save HTML content to its own file and update index."""
-        file_name = f"{doc_id}.html"
-        file_path = os.path.join(self.html_dir, file_name)
+        with self._lock:
+            meta = {
+                "filename": self._body_filename(doc_id),
+                "font": font,
+                "font_size": font_size,
+                "title": title or self.index.get(doc_id, {}).get("title", ""),
+                "last_modified": datetime.now().isoformat(),
+            }
+            self.cache.invalidate(doc_id)
+            self._persist_document(doc_id, html_content, meta)
+            self.metadata.update(doc_id, meta)
+
+            # write-through: the next load of this document is served from memory
+            version = self._body_version(doc_id, meta)
+            if version is not None:
+                self.cache.put(doc_id, version, html_content)
+
+            if self.revisions:
+                self.revisions.record(doc_id, html_content)
+            if self.search_index:
+                self.search_index.update(
+                    doc_id, html_content, meta["title"], meta["last_modified"]
+                )
+
+    def save_documents(self, documents):
+        """
+        Save many new documents with a single index commit (used by bulk import).
+        documents: iterable of dicts with doc_id, html_content and optional
+        title/font/font_size. Imports start without revision history.
+        """
+        with self._lock:
+            now = datetime.now().isoformat()
+            batch = []
+            for doc in documents:
+                doc_id = doc["doc_id"]
+                meta = {
+                    "filename": self._body_filename(doc_id),
+                    "font": doc.get("font"),
+                    "font_size": doc.get("font_size"),
+                    "title": doc.get("title") or "",
+                    "last_modified": now,
+                }
+                self.cache.invalidate(doc_id)
+                batch.append((doc_id, doc["html_content"], meta))
 
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
+            self._persist_documents(batch)
 
-        self.index[doc_id] = {
-            "filename": file_name,
-            "font": font,
-            "font_size": font_size,
-            "title": title or self.index.get(doc_id, {}).get("title", ""),
-            "last_modified": datetime.now().isoformat(),
-        }
-        self._save_index()
+            for doc_id, html_content, meta in batch:
+                self.metadata.update(doc_id, meta)
+            if self.search_index:
+                self.search_index.update_many(
+                    (doc_id, html_content, meta["title"], meta["last_modified"])
+                    for doc_id, html_content, meta in batch
+                )
+            return [doc_id for doc_id, _, _ in batch]
 
     def delete_document(self, doc_id):
         """Delete a document and its metadata."""
-        meta = self.index.pop(doc_id, None)
-        if meta:
+        with self._lock:
+            self.cache.invalidate(doc_id)
+            meta = self.index.pop(doc_id, None)
+            if meta:
+                self._remove_document(doc_id, meta)
+                self.metadata.remove(doc_id)
+            if self.revisions:
+                self.revisions.delete(doc_id)
+            if self.search_index:
+                self.search_index.remove(doc_id)
+
+    def search(self, query, limit=None):
+        """Return doc_ids whose text matches query, best first."""
+        if self.search_index:
+            return self.search_index.search(query, limit=limit)
+
+        # no full-text index: fall back to matching titles
+        needle = query.strip().lower()
+        return [
+            doc_id
+            for doc_id, meta in self.index.items()
+            if needle in (meta.get("title") or "").lower()
+        ][:limit]
+
+    def recompress_documents(self, compress=True, quality=11):
+        """
+        Rewrite every stored body compressed (or back to plain HTML).
+        Returns (bytes_before, bytes_after).
+        """
+        before = after = 0
+        changed = []
+        for doc_id, meta in list(self.index.items()):
+            old_path = os.path.join(self.html_dir, meta["filename"])
+            if not os.path.exists(old_path):
+                continue
+            before += os.path.getsize(old_path)
+
+            new_name = f"{doc_id}.html" + (COMPRESSED_SUFFIX if compress else "")
+            new_path = os.path.join(self.html_dir, new_name)
+            if new_name != meta["filename"] or compress:
+                html_content = read_html_file(old_path)
+                write_html_file(new_path, html_content, quality=quality)
+                if new_path != old_path:
+                    os.remove(old_path)
+                self.index[doc_id] = {**meta, "filename": new_name}
+                changed.append(doc_id)
+            after += os.path.getsize(new_path)
+
+        self.cache.clear()
+        self._commit_many(changed)
+        return before, after
+
+    def close(self):
+        """Flush pending index work before shutdown."""
+        if self.journal:
+            self.journal.close()
+        self._close_extensions()
+
+    def _close_extensions(self):
+        if self.search_index:
+            if self._search_sync:
+                self._search_sync.join()
+            self.search_index.close()
+
+    # storage primitives (override these for another backend)
+
+    def _body_version(self, doc_id, meta):
+        """Return a token that changes whenever the stored body changes, or None if missing."""
+        file_path = os.path.join(self.html_dir, meta["filename"])
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _body_filename(self, doc_id):
+        return f"{doc_id}.html" + (COMPRESSED_SUFFIX if self.compress else "")
+
+    def _read_body(self, doc_id, meta):
+        file_path = os.path.join(self.html_dir, meta["filename"])
+        try:
+            return read_html_file(file_path)
+        except FileNotFoundError:
+            return None
+
+    def _persist_document(self, doc_id, html_content, meta):
+        file_path = os.path.join(self.html_dir, meta["filename"])
+        write_html_file(file_path, html_content)
+
+        # drop the other form if the compression setting changed since last save
+        old_meta = self.index.get(doc_id)
+        if old_meta and old_meta["filename"] != meta["filename"]:
+            old_path = os.path.join(self.html_dir, old_meta["filename"])
+            if os.path.exists(old_path):
+                os.remove(old_path)
+
+        self.index[doc_id] = meta
+        self._commit_index(doc_id)
+
+    def _persist_documents(self, batch):
+        for doc_id, html_content, meta in batch:
             file_path = os.path.join(self.html_dir, meta["filename"])
-            if os.path.exists(file_path):
-                os.remove(file_path)
+            write_html_file(file_path, html_content)
+            self.index[doc_id] = meta
+        self._commit_many([doc_id for doc_id, _, _ in batch])
+
+    def _remove_document(self, doc_id, meta):
+        file_path = os.path.join(self.html_dir, meta["filename"])
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        self._commit_index(doc_id)
+
+    def _commit_index(self, doc_id):
+        """Persist the index change for doc_id."""
+        if not self.journal:
+            self._save_index()
+        elif doc_id in self.index:
+            self.journal.record_set(doc_id, self.index[doc_id], self.index)
+        else:
+            self.journal.record_delete(doc_id, self.index)
+
+    def _commit_many(self, doc_ids):
+        """Persist index changes for several documents in one write."""
+        if not doc_ids:
+            return
+        if self.journal:
+            self.journal.record_many(doc_ids, self.index)
+        else:
             self._save_index()
 
     def _save_index(self):
         """write index to disk"""
-        with open(self.index_file, "w", encoding="utf-8") as f:
+        tmp_file = f"{self.index_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
             json.dump(self.index, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, self.index_file)
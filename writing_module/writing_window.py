@@ -24,6 +24,7 @@ from PySide6.QtCore import Signal, Qt
 
 from .indented_textEditor import IndentedTextEdit
 from .search_bar import SearchBar
+from .autosave import AutosaveController
 
 from ui import PointerButton
 
@@ -31,7 +32,7 @@ from ui import PointerButton
 
 
 class WritingModule(QWidget):
-    document_saved = Signal()
+    document_saved = Signal(str)  # doc_id
 
     def __init__(self, store, pdf_generator, logger):
         super().__init__()
@@ -178,6 +179,18 @@ class WritingModule(QWidget):
         text_editor_container.addWidget(self.textEditSpace)
         search_bar.textEditor = self.textEditSpace
 
+        # debounced background saving; the Save button goes through it too
+        self.autosave = AutosaveController(
+            editor=self.textEditSpace,
+            snapshot=self._save_snapshot,
+            store=self.store,
+            logger=self.logger,
+        )
+        self.autosave.saved.connect(self.document_saved)
+        self.title_input.textEdited.connect(self.autosave.mark_dirty)
+        self.font_selector.currentTextChanged.connect(self.autosave.mark_dirty)
+        self.font_size_combo.currentTextChanged.connect(self.autosave.mark_dirty)
+
         container_layout.addLayout(text_editor_container)
 
         # action buttons
@@ -210,43 +223,44 @@ class WritingModule(QWidget):
 
     # document handling methods
 
-    def create_new_doc(self):
+    def create_new_doc(self, discard_changes=False):
         """create a new empty document with a fresh UUID"""
+        if not discard_changes:
+            self.autosave.flush()
         self.doc_id = str(uuid.uuid4())
         self.title_input.clear()
-        self.textEditSpace.clear()
+        with self.autosave.paused():
+            self.textEditSpace.clear()
+        self.autosave.mark_clean()
+
+    def discard_document(self, doc_id):
+        """
+        doc_id is about to be deleted: drop its queued saves (waiting for one
+        already running) and, if it is open, clear the editor without saving.
+        """
+        if doc_id == self.doc_id:
+            self.create_new_doc(discard_changes=True)
+        self.autosave.discard(doc_id)
 
     def save_text(self):
+        """Persist the current document without reloading it into the editor."""
         if not self.doc_id:
             self.create_new_doc()
 
-        html_content = self.textEditSpace.toHtml()
-        title = self.title_input.text().strip()
-        font = self.font_selector.currentText()
-        font_size = float(self.font_size_combo.currentText())
-        self.store.save_document(self.doc_id, html_content, title, font, font_size)
-        self.document_saved.emit()  # notify that save occurred
-        self.reload_current_document()
-
-    def reload_current_document(self):
-        """reload current document from the store after saving"""
-        if not self.doc_id:
+        # nothing changed since the last save: the file on disk is already current
+        if not self.autosave.dirty and self.doc_id in self.store.index:
             return
-
-        # save cursor position
-        cursor = self.textEditSpace.textCursor()
-        pos = cursor.position()
-
-        # call back to main window to reload
-        mw = self.window()
-        if hasattr(mw, "load_document"):
-            mw.load_document(self.doc_id)
-
-        # restore cursor
-        cursor = self.textEditSpace.textCursor()
-        cursor.setPosition(pos)
-        self.textEditSpace.setTextCursor(cursor)
-        self.textEditSpace.ensureCursorVisible()
+        self.autosave.save_now()
+
+    def _save_snapshot(self):
+        """Serialize the editor once for a save job (runs on the GUI thread)."""
+        return {
+            "doc_id": self.doc_id,
+            "html_content": self.textEditSpace.toHtml(),
+            "title": self.title_input.text().strip(),
+            "font": self.font_selector.currentText(),
+            "font_size": float(self.font_size_combo.currentText()),
+        }
 
     def load_font_and_size(self, font, font_size):
         if font:
@@ -375,23 +389,18 @@ class WritingModule(QWidget):
     # produce PDF
     def print_to_pdf(self):
         # save to update the preview
-        self.save_text()
-
-        extra_styles = """
-            h1 {
-                text-align:center; 
-                }
-            h2 {
-                text-align: left;
-                margin-left: 0.5rem;
-            }
-            h3 {
-                text-align: left;
-                margin-left: 0.5rem;
-            }
-        """
+        if not self.doc_id:
+            self.create_new_doc()
+        if self.doc_id in self.store.index:
+            self.autosave.sync()
+        else:
+            self.autosave.save_now(wait=True)
+
         docs_info = self.store.index
         doc_info = docs_info[self.doc_id]
         self.pdf_generator.run_generator(
-            doc_info["filename"], doc_info["title"], extra_styles=extra_styles
+            doc_info["filename"],
+            doc_info["title"],
+            extra_styles=self.pdf_generator.DOCUMENT_STYLES,
+            html_content=self.store.get_document(self.doc_id),
         )